@@ -1,9 +1,26 @@
-import sqlite3
+import argparse
+import csv
+import itertools
+import json
 import math
+import os
+import random
+import sqlite3
+import sys
+import time
+from collections import OrderedDict
+
+try:
+    import numpy as np
+except ImportError:  # The batch API falls back to plain Python without NumPy
+    np = None
 
 # Define radius of the Earth in kilometers
 EARTH_RADIUS = 6371.0
 
+# Maximum number of bound parameters per SQLite query when looking up many cities
+SQLITE_MAX_PARAMETERS = 900
+
 
 def haversine(lat1, lon1, lat2, lon2):
     """
@@ -27,37 +44,227 @@ def haversine(lat1, lon1, lat2, lon2):
     return distance
 
 
+def haversine_many(lat1, lon1, lat2, lon2):
+    """
+    Vectorized haversine formula.
+    Inputs are sequences (or NumPy arrays) of coordinates in degrees that broadcast against each other,
+    for example a column of origins against a row of destinations.
+    Output:
+      Distances in kilometers (a NumPy array, or a list when NumPy is not installed)
+    """
+    if np is None:
+        return [haversine(*coordinates) for coordinates in zip(lat1, lon1, lat2, lon2)]
+
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(value, dtype=float)) for value in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2)**2
+    return EARTH_RADIUS * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
 class CityDistanceCalculator:
-    def __init__(self, db_name="city_coordinates.db"):
+    # The explicit id keeps the row ids stable (VACUUM may renumber implicit rowids), the R*Tree refers to them
+    CITIES_COLUMNS = "id INTEGER PRIMARY KEY, city_name TEXT NOT NULL UNIQUE, latitude REAL, longitude REAL"
+
+    def __init__(self, db_name="city_coordinates.db", cache_size=1024, preload=False,
+                 distance_cache_size=4096, persist_distances=False):
         """
         Initialize the calculator with an SQLite database for storing city coordinates.
+        Coordinates that were looked up recently are kept in an in-memory LRU cache of cache_size cities.
+        With preload=True the whole table is loaded into an unbounded cache (for small tables).
+        Calculated distances are kept in an LRU cache of distance_cache_size city pairs and,
+        with persist_distances=True, also in a distances table of the same database.
         """
         self.connection = sqlite3.connect(db_name)
         self.cursor = self.connection.cursor()
+        self.persist_distances = persist_distances
         self._create_table()
 
+        self.distance_cache_size = distance_cache_size
+        self.distance_cache = OrderedDict()
+        self.distance_keys_by_city = {}  # city name -> keys of cached pairs that include it
+        self.distance_cache_hits = 0
+        self.distance_cache_misses = 0
+
+        self.cache_size = cache_size
+        self.coordinate_cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        if preload:
+            self.preload_coordinates()
+
     def _create_table(self):
         """
         Create a table for storing city coordinates, if it doesn't already exist.
         """
+        self.cursor.execute(f"CREATE TABLE IF NOT EXISTS cities ({self.CITIES_COLUMNS})")
+        self._migrate_city_ids()
+        self._create_spatial_index()
+        # Created even without persist_distances, so coordinate changes always invalidate stored distances
         self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS cities (
-                city_name TEXT PRIMARY KEY,
-                latitude REAL,
-                longitude REAL
+            CREATE TABLE IF NOT EXISTS distances (
+                city_a TEXT,
+                city_b TEXT,
+                distance REAL,
+                PRIMARY KEY (city_a, city_b)
             )
         ''')
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS distances_city_b ON distances (city_b)")
+        self.connection.commit()
+
+    def _migrate_city_ids(self):
+        """
+        Give a cities table created by earlier versions (keyed on city_name only) an explicit id column.
+        The spatial index and its triggers are dropped and rebuilt from the new ids.
+        """
+        self.cursor.execute("PRAGMA table_info(cities)")
+        if any(column[1] == 'id' for column in self.cursor.fetchall()):
+            return
         self.connection.commit()
+        self.cursor.executescript(f'''
+            BEGIN;
+            DROP TRIGGER IF EXISTS cities_rtree_insert;
+            DROP TRIGGER IF EXISTS cities_rtree_delete;
+            DROP TRIGGER IF EXISTS cities_rtree_update;
+            DROP TABLE IF EXISTS cities_rtree;
+            ALTER TABLE cities RENAME TO cities_without_ids;
+            CREATE TABLE cities ({self.CITIES_COLUMNS});
+            INSERT INTO cities (city_name, latitude, longitude)
+                SELECT city_name, latitude, longitude FROM cities_without_ids ORDER BY rowid;
+            DROP TABLE cities_without_ids;
+            COMMIT;
+        ''')
+
+    def _create_spatial_index(self):
+        """
+        Create an R*Tree index over the city coordinates, kept in sync with the cities table by triggers.
+        """
+        # INSERT OR REPLACE deletes the old row; delete triggers only fire for it with recursive triggers on
+        self.cursor.execute("PRAGMA recursive_triggers = ON")
+        self.cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'cities_rtree'")
+        index_exists = self.cursor.fetchone() is not None
+
+        self.cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS cities_rtree USING rtree(
+                id,
+                min_latitude, max_latitude,
+                min_longitude, max_longitude
+            )
+        ''')
+        self.cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS cities_rtree_insert AFTER INSERT ON cities BEGIN
+                INSERT INTO cities_rtree VALUES (new.id, new.latitude, new.latitude, new.longitude, new.longitude);
+            END
+        ''')
+        self.cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS cities_rtree_delete AFTER DELETE ON cities BEGIN
+                DELETE FROM cities_rtree WHERE id = old.id;
+            END
+        ''')
+        self.cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS cities_rtree_update AFTER UPDATE ON cities BEGIN
+                DELETE FROM cities_rtree WHERE id = old.id;
+                INSERT INTO cities_rtree VALUES (new.id, new.latitude, new.latitude, new.longitude, new.longitude);
+            END
+        ''')
+
+        if not index_exists:
+            # Index the cities stored before the spatial index existed
+            self.cursor.execute('''
+                INSERT INTO cities_rtree SELECT id, latitude, latitude, longitude, longitude FROM cities
+            ''')
+
+    def preload_coordinates(self):
+        """
+        Load the coordinates of every city into the cache and stop evicting entries.
+        """
+        self.cache_size = None
+        self.cursor.execute("SELECT city_name, latitude, longitude FROM cities")
+        for city_name, latitude, longitude in self.cursor.fetchall():
+            self.coordinate_cache[city_name] = (latitude, longitude)
+
+    def _cache_get(self, city_name):
+        """
+        Return cached coordinates of a city (marking them as recently used), or None.
+        """
+        coordinates = self.coordinate_cache.get(city_name)
+        if coordinates is None:
+            self.cache_misses += 1
+            return None
+        self.cache_hits += 1
+        self.coordinate_cache.move_to_end(city_name)
+        return coordinates
+
+    def _cache_put(self, city_name, coordinates):
+        """
+        Store coordinates in the cache, evicting the least recently used city if it is full.
+        """
+        self.coordinate_cache[city_name] = coordinates
+        self.coordinate_cache.move_to_end(city_name)
+        if self.cache_size is not None and len(self.coordinate_cache) > self.cache_size:
+            self.coordinate_cache.popitem(last=False)
+
+    def cache_stats(self):
+        """
+        Return the coordinate cache hit/miss counters.
+        """
+        return {'hits': self.cache_hits, 'misses': self.cache_misses, 'size': len(self.coordinate_cache),
+                'distance_hits': self.distance_cache_hits, 'distance_misses': self.distance_cache_misses,
+                'distance_size': len(self.distance_cache)}
+
+    @staticmethod
+    def _distance_key(city1, city2):
+        """
+        Return the cache key of a city pair; the distance is symmetric, so the order does not matter.
+        """
+        return (city1, city2) if city1 <= city2 else (city2, city1)
+
+    def _distance_cache_put(self, key, distance):
+        """
+        Store a distance in the LRU cache, evicting the least recently used pair if it is full.
+        """
+        self.distance_cache[key] = distance
+        self.distance_cache.move_to_end(key)
+        for city in key:
+            self.distance_keys_by_city.setdefault(city, set()).add(key)
+
+        if len(self.distance_cache) > self.distance_cache_size:
+            evicted_key, _ = self.distance_cache.popitem(last=False)
+            for city in evicted_key:
+                keys = self.distance_keys_by_city.get(city)
+                if keys is not None:
+                    keys.discard(evicted_key)
+                    if not keys:
+                        del self.distance_keys_by_city[city]
+
+    def _invalidate_distances(self, city_names):
+        """
+        Drop cached and persisted distances of cities whose coordinates have changed.
+        Persisted distances are dropped even if this calculator does not persist distances itself,
+        since other sessions may have stored them.
+        """
+        for city_name in city_names:
+            for key in self.distance_keys_by_city.pop(city_name, ()):
+                self.distance_cache.pop(key, None)
+                other_city = key[1] if key[0] == city_name else key[0]
+                if other_city != city_name and other_city in self.distance_keys_by_city:
+                    self.distance_keys_by_city[other_city].discard(key)
+        with self.connection:
+            self.cursor.executemany("DELETE FROM distances WHERE city_a = ? OR city_b = ?",
+                                    ((city_name, city_name) for city_name in city_names))
 
     def get_city_coordinates(self, city_name):
         """
-        Fetch coordinates of a city from the database.
+        Fetch coordinates of a city from the cache or the database.
         If not found, prompt the user to input the coordinates and save them.
         """
+        coordinates = self._cache_get(city_name)
+        if coordinates is not None:
+            return coordinates
+
         self.cursor.execute("SELECT latitude, longitude FROM cities WHERE city_name = ?", (city_name,))
         result = self.cursor.fetchone()
 
         if result:
+            self._cache_put(city_name, result)
             return result
         else:
             print(f"Coordinates for '{city_name}' not found in database.")
@@ -73,15 +280,204 @@ class CityDistanceCalculator:
         self.cursor.execute("INSERT OR REPLACE INTO cities (city_name, latitude, longitude) VALUES (?, ?, ?)",
                             (city_name, latitude, longitude))
         self.connection.commit()
+        # Write-through, so the cache never serves outdated coordinates
+        self._cache_put(city_name, (latitude, longitude))
+        self._invalidate_distances([city_name])
+
+    def add_many_city_coordinates(self, rows):
+        """
+        Add many cities' coordinates to the database with one executemany in a single transaction.
+        rows is an iterable of (city_name, latitude, longitude) tuples.
+        """
+        rows = [(city_name, float(latitude), float(longitude)) for city_name, latitude, longitude in rows]
+        with self.connection:
+            self.cursor.executemany("INSERT OR REPLACE INTO cities (city_name, latitude, longitude) VALUES (?, ?, ?)",
+                                    rows)
+        # Refresh cities that are already cached; the others are loaded when they are used
+        for city_name, latitude, longitude in rows:
+            if city_name in self.coordinate_cache:
+                self.coordinate_cache[city_name] = (latitude, longitude)
+        self._invalidate_distances([city_name for city_name, _, _ in rows])
+        return len(rows)
+
+    def find_cities_within(self, latitude, longitude, radius_km):
+        """
+        Find the stored cities within radius_km of a point.
+        The R*Tree returns the cities in a latitude/longitude bounding box, which are then
+        filtered with the haversine distance.
+        Returns a list of (city_name, distance) tuples, nearest first.
+        """
+        delta_latitude = math.degrees(radius_km / EARTH_RADIUS)
+        min_latitude = latitude - delta_latitude
+        max_latitude = latitude + delta_latitude
+
+        # Near the poles the box covers all longitudes
+        cos_latitude = math.cos(math.radians(max(abs(min_latitude), abs(max_latitude))))
+        if max_latitude >= 90 or min_latitude <= -90 or cos_latitude <= 0:
+            longitude_ranges = [(-180.0, 180.0)]
+        else:
+            delta_longitude = min(180.0, delta_latitude / cos_latitude)
+            min_longitude = longitude - delta_longitude
+            max_longitude = longitude + delta_longitude
+            # Split the box where it crosses the antimeridian
+            if delta_longitude >= 180:
+                longitude_ranges = [(-180.0, 180.0)]
+            elif min_longitude < -180:
+                longitude_ranges = [(min_longitude + 360, 180.0), (-180.0, max_longitude)]
+            elif max_longitude > 180:
+                longitude_ranges = [(min_longitude, 180.0), (-180.0, max_longitude - 360)]
+            else:
+                longitude_ranges = [(min_longitude, max_longitude)]
+
+        candidates = []
+        for min_longitude, max_longitude in longitude_ranges:
+            self.cursor.execute('''
+                SELECT c.city_name, c.latitude, c.longitude
+                FROM cities_rtree r JOIN cities c ON c.id = r.id
+                WHERE r.max_latitude >= ? AND r.min_latitude <= ?
+                  AND r.max_longitude >= ? AND r.min_longitude <= ?
+            ''', (min_latitude, max_latitude, min_longitude, max_longitude))
+            candidates.extend(self.cursor.fetchall())
+
+        if not candidates:
+            return []
+        names, latitudes, longitudes = zip(*candidates)
+        distances = haversine_many([latitude] * len(names), [longitude] * len(names), latitudes, longitudes)
+        return sorted(((name, float(distance)) for name, distance in zip(names, distances) if distance <= radius_km),
+                      key=lambda item: item[1])
+
+    def find_nearest_cities(self, latitude, longitude, count=1, initial_radius_km=50.0):
+        """
+        Find the count stored cities nearest to a point.
+        Radius queries are repeated with a doubled radius until enough cities are found.
+        Returns a list of (city_name, distance) tuples, nearest first.
+        """
+        radius_km = initial_radius_km
+        max_radius_km = math.pi * EARTH_RADIUS
+        while True:
+            found = self.find_cities_within(latitude, longitude, radius_km)
+            if len(found) >= count or radius_km >= max_radius_km:
+                return found[:count]
+            radius_km = min(radius_km * 2, max_radius_km)
+
+    def cities_near(self, city_name, radius_km):
+        """
+        Find the stored cities within radius_km of a city (not including the city itself).
+        """
+        latitude, longitude = self.get_city_coordinates(city_name)
+        return [item for item in self.find_cities_within(latitude, longitude, radius_km) if item[0] != city_name]
+
+    def nearest_to_city(self, city_name, count=1):
+        """
+        Find the count stored cities nearest to a city (not including the city itself).
+        """
+        latitude, longitude = self.get_city_coordinates(city_name)
+        found = self.find_nearest_cities(latitude, longitude, count + 1)
+        return [item for item in found if item[0] != city_name][:count]
 
     def calculate_distance(self, city1, city2):
         """
         Calculate the straight-line distance between two cities.
+        Results are memoized per unordered city pair.
         """
+        key = self._distance_key(city1, city2)
+        distance = self.distance_cache.get(key)
+        if distance is not None:
+            self.distance_cache_hits += 1
+            self.distance_cache.move_to_end(key)
+            return distance
+        self.distance_cache_misses += 1
+
+        if self.persist_distances:
+            self.cursor.execute("SELECT distance FROM distances WHERE city_a = ? AND city_b = ?", key)
+            result = self.cursor.fetchone()
+            if result:
+                self._distance_cache_put(key, result[0])
+                return result[0]
+
         lat1, lon1 = self.get_city_coordinates(city1)
         lat2, lon2 = self.get_city_coordinates(city2)
+        distance = haversine(lat1, lon1, lat2, lon2)
+
+        self._distance_cache_put(key, distance)
+        if self.persist_distances:
+            with self.connection:
+                self.cursor.execute("INSERT OR REPLACE INTO distances (city_a, city_b, distance) VALUES (?, ?, ?)",
+                                    (*key, distance))
+        return distance
+
+    def get_many_coordinates(self, city_names, interactive=True):
+        """
+        Fetch coordinates of many cities from the cache, and the rest with as few queries as possible.
+        Cities that are not in the database are handled by get_city_coordinates, or left out
+        of the result when interactive is False.
+        Returns a dictionary of city name -> (latitude, longitude).
+        """
+        coordinates = {}
+        names = []
+        for name in dict.fromkeys(city_names):
+            cached = self._cache_get(name)
+            if cached is not None:
+                coordinates[name] = cached
+            else:
+                names.append(name)
+
+        for start in range(0, len(names), SQLITE_MAX_PARAMETERS):
+            chunk = names[start:start + SQLITE_MAX_PARAMETERS]
+            placeholders = ', '.join('?' * len(chunk))
+            self.cursor.execute(
+                f"SELECT city_name, latitude, longitude FROM cities WHERE city_name IN ({placeholders})", chunk
+            )
+            for name, latitude, longitude in self.cursor.fetchall():
+                coordinates[name] = (latitude, longitude)
+                self._cache_put(name, (latitude, longitude))
 
-        return haversine(lat1, lon1, lat2, lon2)
+        if interactive:
+            for name in names:
+                if name not in coordinates:
+                    coordinates[name] = self.get_city_coordinates(name)
+        return coordinates
+
+    def calculate_distances(self, pairs):
+        """
+        Calculate the straight-line distances for many (city1, city2) pairs at once.
+        """
+        pairs = list(pairs)
+        coordinates = self.get_many_coordinates(city for pair in pairs for city in pair)
+        lat1, lon1 = zip(*(coordinates[city1] for city1, _ in pairs)) if pairs else ((), ())
+        lat2, lon2 = zip(*(coordinates[city2] for _, city2 in pairs)) if pairs else ((), ())
+        return list(haversine_many(lat1, lon1, lat2, lon2))
+
+    def iter_distance_matrix(self, cities, chunk_size=1024):
+        """
+        Yield the distance matrix of the cities in blocks of at most chunk_size rows,
+        so the temporary arrays stay small for thousands-by-thousands matrices.
+        Yields (first_row_index, block) tuples.
+        """
+        cities = list(cities)
+        coordinates = self.get_many_coordinates(cities)
+        latitudes = [coordinates[city][0] for city in cities]
+        longitudes = [coordinates[city][1] for city in cities]
+
+        for start in range(0, len(cities), chunk_size):
+            row_latitudes = latitudes[start:start + chunk_size]
+            row_longitudes = longitudes[start:start + chunk_size]
+            if np is None:
+                block = [[haversine(lat1, lon1, lat2, lon2) for lat2, lon2 in zip(latitudes, longitudes)]
+                         for lat1, lon1 in zip(row_latitudes, row_longitudes)]
+            else:
+                block = haversine_many(np.array(row_latitudes)[:, np.newaxis], np.array(row_longitudes)[:, np.newaxis],
+                                       np.array(latitudes)[np.newaxis, :], np.array(longitudes)[np.newaxis, :])
+            yield start, block
+
+    def distance_matrix(self, cities, chunk_size=1024):
+        """
+        Calculate the full distance matrix of the cities (row i, column j is the distance from city i to city j).
+        """
+        blocks = [block for _, block in self.iter_distance_matrix(cities, chunk_size)]
+        if np is None:
+            return [row for block in blocks for row in block]
+        return np.vstack(blocks) if blocks else np.zeros((0, 0))
 
     def close(self):
         """
@@ -90,6 +486,157 @@ class CityDistanceCalculator:
         self.connection.close()
 
 
+def benchmark_spatial_queries(sizes=(10_000, 100_000, 1_000_000), queries=100, radius_km=200.0, nearest=10):
+    """
+    Compare R*Tree radius and nearest-neighbour queries with a full haversine scan
+    on in-memory databases of random cities.
+    """
+    results = {}
+    for size in sizes:
+        calculator = CityDistanceCalculator(":memory:")
+        cities = [(f"City{i}", random.uniform(-80, 80), random.uniform(-180, 180)) for i in range(size)]
+        start_time = time.perf_counter()
+        calculator.add_many_city_coordinates(cities)
+        load_time = time.perf_counter() - start_time
+        points = [(random.uniform(-80, 80), random.uniform(-180, 180)) for _ in range(queries)]
+
+        start_time = time.perf_counter()
+        for latitude, longitude in points:
+            calculator.find_cities_within(latitude, longitude, radius_km)
+        radius_time = (time.perf_counter() - start_time) / queries
+
+        start_time = time.perf_counter()
+        for latitude, longitude in points:
+            calculator.find_nearest_cities(latitude, longitude, nearest)
+        nearest_time = (time.perf_counter() - start_time) / queries
+
+        # A full scan is slow, so it is measured on a few queries only
+        scan_queries = points[:max(1, queries // 20)]
+        start_time = time.perf_counter()
+        for latitude, longitude in scan_queries:
+            sorted((haversine(latitude, longitude, lat, lon), name) for name, lat, lon in cities)[:nearest]
+        scan_time = (time.perf_counter() - start_time) / len(scan_queries)
+        calculator.close()
+
+        results[size] = {'load': load_time, 'radius': radius_time, 'nearest': nearest_time, 'scan': scan_time}
+        print(f"{size} cities: load {load_time:.2f}s, radius {radius_time * 1000:.2f} ms, "
+              f"nearest {nearest_time * 1000:.2f} ms, full scan {scan_time * 1000:.2f} ms per query")
+    return results
+
+
+def read_city_pairs(pairs_path):
+    """
+    Stream (city1, city2) pairs from a CSV file (two columns, optional 'city1,city2' header)
+    or from an NDJSON file with one {"city1": ..., "city2": ...} object per line.
+    """
+    with open(pairs_path, 'r', encoding='utf-8', newline='') as pairs_file:
+        if pairs_path.lower().endswith(('.ndjson', '.jsonl')):
+            for line in pairs_file:
+                if line.strip():
+                    pair = json.loads(line)
+                    yield pair['city1'].strip(), pair['city2'].strip()
+        else:
+            for row_number, row in enumerate(csv.reader(pairs_file)):
+                if len(row) < 2 or (row_number == 0 and [value.strip().lower() for value in row[:2]] == ['city1', 'city2']):
+                    continue
+                yield row[0].strip(), row[1].strip()
+
+
+def read_city_coordinates(coordinates_path):
+    """
+    Stream (city_name, latitude, longitude) rows from a CSV file, skipping a header row if there is one.
+    """
+    with open(coordinates_path, 'r', encoding='utf-8', newline='') as coordinates_file:
+        for row_number, row in enumerate(csv.reader(coordinates_file)):
+            if len(row) < 3:
+                continue
+            try:
+                yield row[0].strip(), float(row[1]), float(row[2])
+            except ValueError:
+                if row_number != 0:
+                    raise
+
+
+def process_pairs_file(calculator, pairs_path, output_path, missing_path, chunk_size=10000):
+    """
+    Calculate distances for every pair in a file without any prompts.
+    Pairs are processed in chunks; the results are streamed to output_path as CSV, and pairs with
+    a city that is not in the database are written to missing_path instead.
+    Returns a tuple of (calculated, missing) pair counts.
+    """
+    calculated = 0
+    missing = 0
+    with open(output_path, 'w', encoding='utf-8', newline='') as output_file, \
+            open(missing_path, 'w', encoding='utf-8', newline='') as missing_file:
+        output_writer = csv.writer(output_file)
+        output_writer.writerow(['city1', 'city2', 'distance_km'])
+        missing_writer = csv.writer(missing_file)
+        missing_writer.writerow(['city1', 'city2', 'missing_city'])
+
+        pairs = read_city_pairs(pairs_path)
+        while True:
+            chunk = list(itertools.islice(pairs, chunk_size))
+            if not chunk:
+                break
+
+            coordinates = calculator.get_many_coordinates((city for pair in chunk for city in pair), interactive=False)
+            known_pairs = []
+            for city1, city2 in chunk:
+                unknown = [city for city in (city1, city2) if city not in coordinates]
+                if unknown:
+                    missing_writer.writerows([city1, city2, city] for city in unknown)
+                    missing += 1
+                else:
+                    known_pairs.append((city1, city2))
+
+            if known_pairs:
+                lat1, lon1 = zip(*(coordinates[city1] for city1, _ in known_pairs))
+                lat2, lon2 = zip(*(coordinates[city2] for _, city2 in known_pairs))
+                distances = haversine_many(lat1, lon1, lat2, lon2)
+                output_writer.writerows(
+                    (city1, city2, f"{distance:.3f}") for (city1, city2), distance in zip(known_pairs, distances)
+                )
+                calculated += len(known_pairs)
+
+    return calculated, missing
+
+
+def run_batch(args):
+    """
+    Non-interactive mode: optionally import a coordinates file, then process a pairs file.
+    """
+    calculator = CityDistanceCalculator(args.database)
+    try:
+        if args.coordinates:
+            imported = calculator.add_many_city_coordinates(read_city_coordinates(args.coordinates))
+            print(f"Imported coordinates of {imported} cities from '{args.coordinates}'.")
+
+        if args.pairs:
+            output_path = args.output or os.path.splitext(args.pairs)[0] + '-distances.csv'
+            missing_path = args.missing or os.path.splitext(args.pairs)[0] + '-missing.csv'
+            start_time = time.perf_counter()
+            calculated, missing = process_pairs_file(calculator, args.pairs, output_path, missing_path,
+                                                     args.chunk_size)
+            elapsed = time.perf_counter() - start_time
+            print(f"Calculated {calculated} distances in {elapsed:.2f}s ({calculated / max(elapsed, 1e-9) * 60:.0f} pairs/min) "
+                  f"-> '{output_path}'.")
+            if missing:
+                print(f"{missing} pair(s) with unknown cities -> '{missing_path}'.")
+    finally:
+        calculator.close()
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="City Distance Calculator. Without arguments it runs interactively.")
+    parser.add_argument('--database', default="city_coordinates.db", help="SQLite database with city coordinates")
+    parser.add_argument('--coordinates', help="CSV file of city_name,latitude,longitude rows to import")
+    parser.add_argument('--pairs', help="CSV (city1,city2) or NDJSON file of city pairs")
+    parser.add_argument('--output', help="CSV file for the distances (default: <pairs>-distances.csv)")
+    parser.add_argument('--missing', help="CSV file for pairs with unknown cities (default: <pairs>-missing.csv)")
+    parser.add_argument('--chunk-size', type=int, default=10000, help="Number of pairs processed at a time")
+    return parser.parse_args(argv)
+
+
 def main():
     print("Welcome to the City Distance Calculator Tool!")
     calculator = CityDistanceCalculator()
@@ -113,4 +660,7 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 1:
+        run_batch(parse_arguments())
+    else:
+        main()
\ No newline at end of file
@@ -1,6 +1,18 @@
 import csv
+import hashlib
+import heapq
+import json
+import math
+import mmap
 import os
+import random
 import string
+import time
+import tracemalloc
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
 import sqlite3  # For database-related functionalities
 
 
@@ -11,23 +23,39 @@ word_count_csv_path = os.path.join(DEFAULT_FOLDER, 'word-count.csv')
 letter_count_csv_path = os.path.join(DEFAULT_FOLDER, 'letter-count.csv')
 database_path = os.path.join(DEFAULT_FOLDER, 'records.db')  # SQLite database file
 
+# Number of characters read per chunk when analyzing the input file
+CHUNK_SIZE = 1024 * 1024
+
+# Number of leading bytes compared to detect that the input file was replaced
+CHECKPOINT_HEAD_SIZE = 64 * 1024
+
 
 class DatabaseHandler:
     """A class to manage database operations."""
 
-    def __init__(self, db_path):
+    def __init__(self, db_path, journal_mode='WAL', synchronous='NORMAL', cache_size=-64000):
         """
         Initialize the database handler and set up the required tables.
         :param db_path: Path to the SQLite database file.
+        :param journal_mode: SQLite journal mode (WAL lets readers work while a batch is written).
+        :param synchronous: SQLite synchronous level (OFF, NORMAL, FULL or EXTRA).
+        :param cache_size: SQLite page cache size (negative values are KiB, positive values are pages).
         """
         self.db_path = db_path
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.cache_size = cache_size
         self.connection = None
+        self.in_transaction = False
         self.connect()
         self.create_tables()
 
     def connect(self):
         """Establish a connection to the SQLite database."""
         self.connection = sqlite3.connect(self.db_path)
+        self.connection.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+        self.connection.execute(f"PRAGMA synchronous = {self.synchronous}")
+        self.connection.execute(f"PRAGMA cache_size = {int(self.cache_size)}")
         print(f"Connected to database: {self.db_path}")
 
     def disconnect(self):
@@ -36,6 +64,22 @@ class DatabaseHandler:
             self.connection.close()
             print("Disconnected from the database.")
 
+    @contextmanager
+    def transaction(self):
+        """
+        Run the enclosed statements in one transaction.
+        Nested calls join the outermost transaction, so several inserts can be committed together.
+        """
+        if self.in_transaction:
+            yield self.connection
+            return
+        self.in_transaction = True
+        try:
+            with self.connection:
+                yield self.connection
+        finally:
+            self.in_transaction = False
+
     def create_tables(self):
         """Create tables for storing word and letter statistics, if they don't already exist."""
         cursor = self.connection.cursor()
@@ -62,6 +106,17 @@ class DatabaseHandler:
             )
         ''')
 
+        # Table for incremental processing checkpoints (one row per input file)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS stats_checkpoint (
+                input_file TEXT PRIMARY KEY,
+                byte_offset INTEGER NOT NULL,
+                head_digest TEXT NOT NULL,
+                word_count TEXT NOT NULL,
+                char_counts TEXT NOT NULL
+            )
+        ''')
+
         self.connection.commit()
         print("Tables created (or already exist).")
 
@@ -71,15 +126,7 @@ class DatabaseHandler:
         :param word: The word to insert.
         :param count: The count of the word to insert.
         """
-        cursor = self.connection.cursor()
-        try:
-            cursor.execute(
-                'INSERT OR IGNORE INTO word_count (word, count) VALUES (?, ?)',
-                (word, count)
-            )
-            self.connection.commit()
-        except sqlite3.IntegrityError:
-            print(f"Record for word '{word}' already exists, ignoring duplicate.")
+        self.insert_word_counts({word: count})
 
     def insert_letter_statistics(self, letter, count_all, count_uppercase, percentage_uppercase):
         """
@@ -89,16 +136,89 @@ class DatabaseHandler:
         :param count_uppercase: Total uppercase occurrences of the letter.
         :param percentage_uppercase: Percentage of uppercase occurrences.
         """
-        cursor = self.connection.cursor()
-        try:
-            cursor.execute(
-                'INSERT OR IGNORE INTO letter_statistics (letter, count_all, count_uppercase, percentage)
-                 VALUES (?, ?, ?, ?)',
-                (letter, count_all, count_uppercase, percentage_uppercase)
+        self.insert_letter_statistics_bulk([(letter, count_all, count_uppercase, percentage_uppercase)])
+
+    def insert_word_counts(self, word_count):
+        """
+        Insert all word counts in one transaction.
+        Counts of words that are already stored are added to the existing counts.
+        :param word_count: Dictionary of word -> count.
+        """
+        with self.transaction():
+            self.connection.executemany(
+                '''
+                INSERT INTO word_count (word, count) VALUES (?, ?)
+                ON CONFLICT(word) DO UPDATE SET count = count + excluded.count
+                ''',
+                word_count.items()
+            )
+
+    def insert_letter_statistics_bulk(self, rows):
+        """
+        Insert letter statistics in one transaction.
+        Counts of letters that are already stored are added to the existing counts
+        (negative counts subtract) and the uppercase percentage is recalculated from the totals.
+        :param rows: Iterable of (letter, count_all, count_uppercase, percentage_uppercase) tuples.
+        """
+        with self.transaction():
+            self.connection.executemany(
+                '''
+                INSERT INTO letter_statistics (letter, count_all, count_uppercase, percentage_uppercase)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(letter) DO UPDATE SET
+                    count_all = count_all + excluded.count_all,
+                    count_uppercase = count_uppercase + excluded.count_uppercase,
+                    percentage_uppercase = CASE WHEN count_all + excluded.count_all > 0
+                        THEN (count_uppercase + excluded.count_uppercase) * 100.0 / (count_all + excluded.count_all)
+                        ELSE 0 END
+                ''',
+                rows
+            )
+
+    def delete_empty_statistics(self):
+        """Remove words and letters whose counts dropped to zero after a subtraction."""
+        with self.transaction():
+            self.connection.execute('DELETE FROM word_count WHERE count <= 0')
+            self.connection.execute('DELETE FROM letter_statistics WHERE count_all <= 0')
+
+    def load_checkpoint(self, input_file):
+        """
+        Load the incremental processing checkpoint of an input file.
+        :param input_file: Path to the input file.
+        :return: Dictionary with byte_offset, head_digest, word_count and char_counts, or None.
+        """
+        row = self.connection.execute(
+            'SELECT byte_offset, head_digest, word_count, char_counts FROM stats_checkpoint WHERE input_file = ?',
+            (os.path.abspath(input_file),)
+        ).fetchone()
+        if row is None:
+            return None
+
+        return {
+            'byte_offset': row[0],
+            'head_digest': row[1],
+            'word_count': Counter(json.loads(row[2])),
+            'char_counts': Counter(json.loads(row[3])),
+        }
+
+    def save_checkpoint(self, input_file, byte_offset, head_digest, word_count, char_counts):
+        """
+        Save the incremental processing checkpoint of an input file.
+        :param input_file: Path to the input file.
+        :param byte_offset: Offset up to which the file has been analyzed.
+        :param head_digest: Digest of the analyzed head of the file, used to detect rotation.
+        :param word_count: Running word counts.
+        :param char_counts: Running character histogram.
+        """
+        with self.transaction():
+            self.connection.execute(
+                '''
+                INSERT OR REPLACE INTO stats_checkpoint (input_file, byte_offset, head_digest, word_count, char_counts)
+                VALUES (?, ?, ?, ?, ?)
+                ''',
+                (os.path.abspath(input_file), byte_offset, head_digest,
+                 json.dumps(word_count, ensure_ascii=False), json.dumps(char_counts, ensure_ascii=False))
             )
-            self.connection.commit()
-        except sqlite3.IntegrityError:
-            print(f"Record for letter '{letter}' already exists, ignoring duplicate.")
 
 
 def preprocess_text(text):
@@ -106,8 +226,16 @@ def preprocess_text(text):
     return text.lower().translate(str.maketrans("", "", string.punctuation)).strip()
 
 
-def calculate_word_count(file_path):
-    """Calculate the count of each word in the file."""
+def calculate_word_count(file_path, workers=1):
+    """
+    Calculate the count of each word in the file.
+    :param file_path: Path to the text file.
+    :param workers: Number of worker processes. With more than one worker the file is
+                    split into line-aligned shards that are counted in parallel.
+    """
+    if workers > 1:
+        return calculate_word_count_parallel(file_path, workers)
+
     word_count = {}
     with open(file_path, 'r', encoding='utf-8') as f:
         for line in f:
@@ -117,9 +245,270 @@ def calculate_word_count(file_path):
     return word_count
 
 
+def find_shard_boundaries(file_path, shard_count):
+    """
+    Split a file into byte ranges that start and end on line boundaries.
+    :param file_path: Path to the text file.
+    :param shard_count: Desired number of shards.
+    :return: List of (start, end) byte offsets covering the whole file.
+    """
+    file_size = os.path.getsize(file_path)
+    boundaries = [0]
+
+    with open(file_path, 'rb') as f:
+        for i in range(1, shard_count):
+            f.seek(max(file_size * i // shard_count, boundaries[-1]))
+            f.readline()  # Move to the start of the next line
+            boundaries.append(min(f.tell(), file_size))
+    boundaries.append(file_size)
+
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+
+def count_words_in_range(file_path, start, end, chunk_size=CHUNK_SIZE):
+    """
+    Count the words in the byte range [start, end) of a file.
+    Runs in a worker process, so it only uses its own local Counter.
+    """
+    word_count = Counter()
+    punctuation_table = str.maketrans("", "", string.punctuation)
+
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        position = start
+        while position < end:
+            chunk = f.read(min(chunk_size, end - position))
+            # Extend the chunk to the end of the line so no word is split in two
+            if not chunk.endswith(b'\n') and position + len(chunk) < end:
+                chunk += f.readline()
+            position += len(chunk)
+            word_count.update(chunk.decode('utf-8').lower().translate(punctuation_table).split())
+
+    return word_count
+
+
+def merge_counters(counters):
+    """Merge partial Counters pairwise, like a tree, until one result is left."""
+    counters = list(counters) or [Counter()]
+    while len(counters) > 1:
+        merged = []
+        for i in range(0, len(counters) - 1, 2):
+            counters[i].update(counters[i + 1])
+            merged.append(counters[i])
+        if len(counters) % 2:
+            merged.append(counters[-1])
+        counters = merged
+    return counters[0]
+
+
+def calculate_word_count_parallel(file_path, workers=None):
+    """
+    Calculate the count of each word in the file using several processes.
+    The result is identical to the serial calculate_word_count.
+    :param file_path: Path to the text file.
+    :param workers: Number of worker processes (defaults to the number of CPUs).
+    """
+    workers = workers or os.cpu_count() or 1
+    shards = find_shard_boundaries(file_path, workers)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(count_words_in_range, file_path, start, end) for start, end in shards]
+        partial_counts = [future.result() for future in futures]
+
+    return dict(merge_counters(partial_counts))
+
+
+def benchmark_word_count(file_path, worker_counts=(1, 2, 4, 8)):
+    """
+    Measure how word counting scales with the number of worker processes.
+    :param file_path: Path to the text file used for the benchmark.
+    :param worker_counts: Worker counts to measure.
+    :return: Dictionary of worker count -> elapsed seconds.
+    """
+    start_time = time.perf_counter()
+    expected = calculate_word_count(file_path)
+    serial_time = time.perf_counter() - start_time
+    print(f"Serial: {serial_time:.3f}s")
+
+    results = {}
+    for workers in worker_counts:
+        start_time = time.perf_counter()
+        word_count = calculate_word_count_parallel(file_path, workers)
+        elapsed = time.perf_counter() - start_time
+        if word_count != expected:
+            raise ValueError(f"Parallel result with {workers} workers differs from the serial result.")
+        results[workers] = elapsed
+        print(f"{workers} worker(s): {elapsed:.3f}s (speedup x{serial_time / elapsed:.2f})")
+
+    return results
+
+
+class CountMinSketch:
+    """
+    Approximate word counts in fixed memory.
+    Estimates never undercount; with probability 1 - delta they overcount by at most
+    epsilon * (total number of counted words).
+    """
+
+    def __init__(self, epsilon=0.0001, delta=0.01, memory_cap=None):
+        """
+        Initialize the sketch.
+        :param epsilon: Maximum overcount as a fraction of all counted words.
+        :param delta: Probability that an estimate is outside the epsilon bound.
+        :param memory_cap: Optional upper limit for the counter table in bytes (reduces the width, and so the accuracy).
+        """
+        self.depth = max(1, math.ceil(math.log(1 / delta)))
+        self.width = max(1, math.ceil(math.e / epsilon))
+        if memory_cap:
+            self.width = max(1, min(self.width, memory_cap // (8 * self.depth)))
+        self.table = [array('Q', bytes(8 * self.width)) for _ in range(self.depth)]
+        self.total = 0
+
+    def add(self, word, count=1):
+        """Add occurrences of a word and return its new estimate."""
+        self.total += count
+        estimates = []
+        for row, index in zip(self.table, self.indexes(word)):
+            row[index] += count
+            estimates.append(row[index])
+        return min(estimates)
+
+    def estimate(self, word):
+        """Return the estimated count of a word."""
+        return min(row[index] for row, index in zip(self.table, self.indexes(word)))
+
+    def indexes(self, word):
+        """Return the counter index of a word in every row (double hashing, so only two hashes per word)."""
+        first_hash = hash(word)
+        second_hash = hash((word, self.depth)) | 1
+        return [(first_hash + seed * second_hash) % self.width for seed in range(self.depth)]
+
+
+class TopKTracker:
+    """Keep the words with the highest estimated counts, holding at most `capacity` candidates."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}
+        self.heap = []  # (count, word) entries; outdated entries are skipped when popped
+
+    def offer(self, word, count):
+        """Record the current estimate of a word, replacing the weakest candidate if needed."""
+        if word not in self.counts and len(self.counts) >= self.capacity:
+            # The heap top is never above the real minimum, so this rejects most words cheaply
+            if count <= self.heap[0][0]:
+                return
+            # Drop outdated heap entries until the top is the real minimum
+            while self.heap[0][0] != self.counts.get(self.heap[0][1]):
+                heapq.heappop(self.heap)
+            if count <= self.heap[0][0]:
+                return
+            del self.counts[heapq.heappop(self.heap)[1]]
+
+        self.counts[word] = count
+        heapq.heappush(self.heap, (count, word))
+        if len(self.heap) > 4 * self.capacity:
+            self.heap = [(count, word) for word, count in self.counts.items()]
+            heapq.heapify(self.heap)
+
+    def top(self, n):
+        """Return the n words with the highest counts as (word, count) tuples."""
+        return heapq.nlargest(n, self.counts.items(), key=lambda item: item[1])
+
+
+def calculate_top_words(file_path, top_n=100, epsilon=0.0001, delta=0.01, memory_cap=None,
+                        ignore_numbers=False, chunk_size=CHUNK_SIZE):
+    """
+    Calculate the most frequent words with bounded memory.
+    Counts are Count-Min Sketch estimates, so they may be slightly too high but never too low.
+    :param file_path: Path to the text file.
+    :param top_n: Number of words to return.
+    :param epsilon: Maximum overcount as a fraction of all words in the file.
+    :param delta: Probability that an estimate is outside the epsilon bound.
+    :param memory_cap: Optional upper limit for the sketch table in bytes.
+    :param ignore_numbers: Skip tokens made only of digits.
+    :param chunk_size: Approximate number of characters read per chunk.
+    :return: List of (word, estimated_count) tuples, most frequent first.
+    """
+    sketch = CountMinSketch(epsilon, delta, memory_cap)
+    tracker = TopKTracker(max(top_n * 10, 100))
+    punctuation_table = str.maketrans("", "", string.punctuation)
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            # Extend the chunk to the end of the line so no word is split in two
+            if not chunk.endswith('\n'):
+                chunk += f.readline()
+
+            # Exact counts within one chunk keep the number of sketch updates low
+            for word, count in Counter(chunk.lower().translate(punctuation_table).split()).items():
+                if ignore_numbers and word.isdigit():
+                    continue
+                tracker.offer(word, sketch.add(word, count))
+
+    return tracker.top(top_n)
+
+
+def write_top_words_to_csv(top_words, csv_path):
+    """Write the most frequent words to a CSV file, most frequent first."""
+    with open(csv_path, 'w', encoding='utf-8', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['Word', 'Count'])
+        writer.writerows(top_words)
+
+
+def benchmark_top_words(file_path, word_total=2_000_000, vocabulary=1_000_000, top_n=100, epsilon=0.00002):
+    """
+    Compare exact word counting with calculate_top_words on a synthetic Zipf-distributed corpus.
+    Reports time, peak Python memory, how many of the exact top words were found and the
+    mean relative error of their estimated counts.
+    :param file_path: Path where the synthetic corpus is written (it will be removed).
+    :return: Dictionary with the measurements.
+    """
+    words = [f"w{i}" for i in range(vocabulary)]
+    weights = [1 / rank for rank in range(1, vocabulary + 1)]
+    with open(file_path, 'w', encoding='utf-8') as f:
+        for _ in range(word_total // 10_000):
+            f.write(' '.join(random.choices(words, weights, k=10_000)) + '\n')
+
+    results = {}
+    for label, counter in (
+        ('exact', lambda: Counter(calculate_word_count(file_path)).most_common(top_n)),
+        ('approximate', lambda: calculate_top_words(file_path, top_n, epsilon)),
+    ):
+        start_time = time.perf_counter()
+        top_words = counter()
+        elapsed = time.perf_counter() - start_time
+
+        # Memory is measured in a second run, since tracing slows the counting down
+        tracemalloc.start()
+        counter()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results[label] = {'seconds': elapsed, 'peak_bytes': peak_memory, 'top_words': top_words}
+        print(f"{label}: {elapsed:.2f}s, peak memory {peak_memory / 1024 / 1024:.1f} MiB")
+
+    exact = dict(results['exact']['top_words'])
+    approximate = dict(results['approximate']['top_words'])
+    found = [word for word in exact if word in approximate]
+    results['recall'] = len(found) / len(exact) if exact else 1.0
+    results['mean_relative_error'] = (
+        sum((approximate[word] - exact[word]) / exact[word] for word in found) / len(found) if found else 0.0
+    )
+    print(f"Top-{top_n} recall: {results['recall']:.2%}, "
+          f"mean relative error of counts: {results['mean_relative_error']:.4%}")
+
+    os.remove(file_path)
+    return results
+
+
 def calculate_letter_statistics(file_path):
     """Calculate letter statistics for the file."""
     letter_stats = {}
+    uppercase_stats = {}
     total_letters = 0
     total_uppercase_letters = 0
 
@@ -128,21 +517,241 @@ def calculate_letter_statistics(file_path):
             for char in line:
                 if char.isalpha():  # Check if the character is alphabetic
                     total_letters += 1
-                    if char.isupper():
-                        total_uppercase_letters += 1
-
                     char_lower = char.lower()
                     letter_stats[char_lower] = letter_stats.get(char_lower, 0) + 1
 
+                    if char.isupper():
+                        total_uppercase_letters += 1
+                        uppercase_stats[char_lower] = uppercase_stats.get(char_lower, 0) + 1
+
     # Calculate the percentage of uppercase letters
     return {
         'letter_stats': letter_stats,
+        'uppercase_stats': uppercase_stats,
         'total_letters': total_letters,
         'total_uppercase_letters': total_uppercase_letters,
         'uppercase_percentage': (total_uppercase_letters / total_letters * 100) if total_letters else 0
     }
 
 
+class LetterCounter:
+    """
+    Compact per-letter counters.
+    Totals and uppercase counts of letters whose lowercase form is in the Latin-1 range are kept in two
+    fixed-size arrays indexed by code point; any other letter goes to a small overflow dictionary.
+    """
+
+    ARRAY_SIZE = 256
+
+    def __init__(self):
+        self.totals = array('Q', bytes(8 * self.ARRAY_SIZE))
+        self.uppercase = array('Q', bytes(8 * self.ARRAY_SIZE))
+        self.overflow = {}  # lowercase letter -> [total, uppercase]
+
+    @classmethod
+    def from_histogram(cls, char_counts):
+        """
+        Build the counters from a character histogram.
+        Only the distinct characters are inspected, not every occurrence.
+        :param char_counts: Mapping of character -> number of occurrences.
+        """
+        counter = cls()
+        for char, count in char_counts.items():
+            if char.isalpha():
+                counter.add(char.lower(), count, count if char.isupper() else 0)
+        return counter
+
+    @classmethod
+    def from_statistics(cls, stats):
+        """Build the counters from a letter statistics dictionary."""
+        counter = cls()
+        uppercase_stats = stats.get('uppercase_stats', {})
+        for letter, count in stats['letter_stats'].items():
+            counter.add(letter, count, uppercase_stats.get(letter, 0))
+        return counter
+
+    def add(self, letter, count, count_uppercase=0):
+        """Add occurrences of a lowercase letter."""
+        code = ord(letter) if len(letter) == 1 else self.ARRAY_SIZE
+        if code < self.ARRAY_SIZE:
+            self.totals[code] += count
+            self.uppercase[code] += count_uppercase
+        else:
+            counts = self.overflow.setdefault(letter, [0, 0])
+            counts[0] += count
+            counts[1] += count_uppercase
+
+    def merge(self, other):
+        """Add the counters of another LetterCounter (for example from another shard)."""
+        for code in range(self.ARRAY_SIZE):
+            if other.totals[code]:
+                self.totals[code] += other.totals[code]
+                self.uppercase[code] += other.uppercase[code]
+        for letter, (count, count_uppercase) in other.overflow.items():
+            self.add(letter, count, count_uppercase)
+        return self
+
+    def counts(self):
+        """Yield (letter, count_all, count_uppercase) for every letter that occurred."""
+        for code in range(self.ARRAY_SIZE):
+            if self.totals[code]:
+                yield chr(code), self.totals[code], self.uppercase[code]
+        for letter, (count, count_uppercase) in self.overflow.items():
+            yield letter, count, count_uppercase
+
+    def rows(self):
+        """Return sorted (letter, count_all, count_uppercase, percentage_uppercase) rows for the CSV file and the database."""
+        return [
+            (letter, count, count_uppercase, (count_uppercase / count * 100) if count else 0)
+            for letter, count, count_uppercase in sorted(self.counts())
+        ]
+
+    def to_statistics(self):
+        """Return the letter statistics dictionary used by the CSV writers."""
+        letter_stats = {}
+        uppercase_stats = {}
+        for letter, count, count_uppercase in self.counts():
+            letter_stats[letter] = count
+            if count_uppercase:
+                uppercase_stats[letter] = count_uppercase
+
+        total_letters = sum(letter_stats.values())
+        total_uppercase_letters = sum(uppercase_stats.values())
+        return {
+            'letter_stats': letter_stats,
+            'uppercase_stats': uppercase_stats,
+            'total_letters': total_letters,
+            'total_uppercase_letters': total_uppercase_letters,
+            'uppercase_percentage': (total_uppercase_letters / total_letters * 100) if total_letters else 0
+        }
+
+
+def build_letter_statistics(char_counts):
+    """
+    Fold a character histogram into the letter statistics structure.
+    :param char_counts: Mapping of character -> number of occurrences.
+    """
+    return LetterCounter.from_histogram(char_counts).to_statistics()
+
+
+def calculate_letter_statistics_mmap(file_path, chunk_size=CHUNK_SIZE):
+    """
+    Calculate letter statistics by counting raw bytes of a memory-mapped file.
+    ASCII chunks are counted with bytes.count per letter without decoding.
+    Only chunks that contain non-ASCII bytes are decoded and counted per character.
+    :param file_path: Path to the text file.
+    :param chunk_size: Approximate number of bytes inspected per chunk.
+    :return: Letter statistics in the same format as calculate_letter_statistics.
+    """
+    char_counts = Counter()
+    if os.path.getsize(file_path) == 0:
+        return build_letter_statistics(char_counts)
+
+    ascii_letters = [(letter, letter.encode('ascii')) for letter in string.ascii_letters]
+
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while start < len(mm):
+            # End the chunk on a line boundary so no multi-byte character is split
+            end = mm.find(b'\n', min(start + chunk_size, len(mm)) - 1)
+            end = len(mm) if end == -1 else end + 1
+            chunk = mm[start:end]
+
+            if chunk.isascii():
+                for letter, letter_byte in ascii_letters:
+                    char_counts[letter] += chunk.count(letter_byte)
+            else:
+                char_counts.update(chunk.decode('utf-8'))
+            start = end
+
+    return build_letter_statistics(char_counts)
+
+
+def analyze_file(file_path, chunk_size=CHUNK_SIZE):
+    """
+    Calculate word count and letter statistics in a single pass over the file.
+    :param file_path: Path to the text file.
+    :param chunk_size: Approximate number of characters read per chunk.
+    :return: Tuple of (word_count, letter_statistics) in the same format as
+             calculate_word_count and calculate_letter_statistics.
+    """
+    word_count = Counter()
+    char_counts = Counter()
+    punctuation_table = str.maketrans("", "", string.punctuation)
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            # Extend the chunk to the end of the line so no word is split in two
+            if not chunk.endswith('\n'):
+                chunk += f.readline()
+
+            char_counts.update(chunk)
+            word_count.update(chunk.lower().translate(punctuation_table).split())
+
+    return dict(word_count), build_letter_statistics(char_counts)
+
+
+def analyze_file_range(file_path, start=0, chunk_size=CHUNK_SIZE):
+    """
+    Count words and characters from a byte offset up to the last complete line of the file.
+    A trailing line without a newline is left for the next run, since it may still be written.
+    :param file_path: Path to the text file.
+    :param start: Byte offset to start from (must be the start of a line).
+    :param chunk_size: Approximate number of bytes read per chunk.
+    :return: Tuple of (word_count, char_counts, end_offset).
+    """
+    word_count = Counter()
+    char_counts = Counter()
+    punctuation_table = str.maketrans("", "", string.punctuation)
+    end_offset = start
+
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            # Extend the chunk to the end of the line so no word is split in two
+            if not chunk.endswith(b'\n'):
+                chunk += f.readline()
+            if not chunk.endswith(b'\n'):
+                chunk = chunk[:chunk.rfind(b'\n') + 1]
+                if not chunk:
+                    break
+
+            text = chunk.decode('utf-8')
+            char_counts.update(text)
+            word_count.update(text.lower().translate(punctuation_table).split())
+            end_offset += len(chunk)
+
+    return word_count, char_counts, end_offset
+
+
+def file_head_digest(file_path, length):
+    """Return a digest of the first bytes of the file (at most CHECKPOINT_HEAD_SIZE bytes)."""
+    with open(file_path, 'rb') as f:
+        return hashlib.sha1(f.read(min(length, CHECKPOINT_HEAD_SIZE))).hexdigest()
+
+
+def checkpoint_is_valid(input_file, checkpoint):
+    """
+    Check that a checkpoint still describes the head of the input file.
+    :param input_file: Path to the input file.
+    :param checkpoint: Checkpoint loaded with DatabaseHandler.load_checkpoint.
+    :return: False if the file was truncated, rotated or rewritten since the checkpoint.
+    """
+    if os.path.getsize(input_file) < checkpoint['byte_offset']:
+        print(f"Input file '{input_file}' was truncated. Rebuilding statistics.")
+        return False
+    if file_head_digest(input_file, checkpoint['byte_offset']) != checkpoint['head_digest']:
+        print(f"Input file '{input_file}' was replaced. Rebuilding statistics.")
+        return False
+    return True
+
+
 def write_word_count_to_csv(word_count, csv_path):
     """Write word count to a CSV file."""
     with open(csv_path, 'w', encoding='utf-8', newline='') as csvfile:
@@ -157,10 +766,81 @@ def write_letter_statistics_to_csv(stats, csv_path):
     with open(csv_path, 'w', encoding='utf-8', newline='') as csvfile:
         writer = csv.writer(csvfile)
         writer.writerow(['Letter', 'Count_All', 'Count_Uppercase', 'Percentage_Uppercase'])
-        for letter, count in sorted(stats['letter_stats'].items()):
-            count_uppercase = stats['letter_stats'].get(letter.upper(), 0)
-            percentage_uppercase = (count_uppercase / count * 100) if count else 0
-            writer.writerow([letter, count, count_uppercase, percentage_uppercase])
+        writer.writerows(LetterCounter.from_statistics(stats).rows())
+
+
+def benchmark_database_inserts(db_path, word_total=1_000_000, row_by_row_sample=5_000):
+    """
+    Compare rows/sec of committing every row against the bulk insert API.
+    Committing every row is measured on a sample only, because it is too slow for the whole corpus.
+    :param db_path: Path to a scratch SQLite database file (it will be removed).
+    :param word_total: Number of distinct words in the synthetic corpus.
+    :param row_by_row_sample: Number of words inserted one commit at a time.
+    :return: Dictionary with rows/sec for both approaches.
+    """
+    word_count = {f"word{i}": i % 100 + 1 for i in range(word_total)}
+    sample = dict(list(word_count.items())[:row_by_row_sample])
+    results = {}
+
+    for label, journal_mode, synchronous, insert in (
+        ('row_by_row', 'DELETE', 'FULL', lambda handler: [
+            handler.insert_word_count(word, count) for word, count in sample.items()
+        ]),
+        ('bulk', 'WAL', 'NORMAL', lambda handler: handler.insert_word_counts(word_count)),
+    ):
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+        handler = DatabaseHandler(db_path, journal_mode=journal_mode, synchronous=synchronous)
+        rows = len(sample) if label == 'row_by_row' else len(word_count)
+        start_time = time.perf_counter()
+        insert(handler)
+        elapsed = time.perf_counter() - start_time
+        handler.disconnect()
+
+        results[label] = rows / elapsed
+        print(f"{label}: {rows} rows in {elapsed:.3f}s ({results[label]:.0f} rows/sec)")
+
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+
+    return results
+
+
+def save_statistics_to_database(db_handler, word_count, letter_statistics):
+    """Save word count and letter statistics to the database in bulk, in one transaction."""
+    with db_handler.transaction():
+        db_handler.insert_word_counts(word_count)
+        db_handler.insert_letter_statistics_bulk(LetterCounter.from_statistics(letter_statistics).rows())
+
+
+def save_statistics_delta(db_handler, word_delta, char_delta):
+    """
+    Add the change of word counts and character histogram to the database tables.
+    :param db_handler: DatabaseHandler holding the statistics tables.
+    :param word_delta: Counter of word -> change (negative values subtract).
+    :param char_delta: Counter of character -> change (negative values subtract).
+    """
+    word_delta = {word: count for word, count in word_delta.items() if count}
+    if word_delta:
+        db_handler.insert_word_counts(word_delta)
+
+    # Deltas can be negative, so a plain dictionary is used instead of the unsigned LetterCounter arrays
+    letter_delta = {}
+    for char, count in char_delta.items():
+        if count and char.isalpha():
+            counts = letter_delta.setdefault(char.lower(), [0, 0])
+            counts[0] += count
+            if char.isupper():
+                counts[1] += count
+    db_handler.insert_letter_statistics_bulk(
+        (letter, count_all, count_uppercase, (count_uppercase / count_all * 100) if count_all > 0 else 0)
+        for letter, (count_all, count_uppercase) in letter_delta.items() if count_all or count_uppercase
+    )
+    if any(count < 0 for count in word_delta.values()) or any(counts[0] < 0 for counts in letter_delta.values()):
+        db_handler.delete_empty_statistics()
 
 
 def recreate_csv_files(input_file, word_count_csv, letter_count_csv, db_handler):
@@ -176,26 +856,126 @@ def recreate_csv_files(input_file, word_count_csv, letter_count_csv, db_handler)
 
     print(f"Processing file: {input_file}")
 
-    # Process word count
-    word_count = calculate_word_count(input_file)
+    # Process word count and letter statistics in one pass over the file
+    word_count, letter_statistics = analyze_file(input_file)
     write_word_count_to_csv(word_count, word_count_csv)
+    write_letter_statistics_to_csv(letter_statistics, letter_count_csv)
+    save_statistics_to_database(db_handler, word_count, letter_statistics)
 
-    for word, count in word_count.items():
-        db_handler.insert_word_count(word, count)
+    print(f"Files created:\n - {word_count_csv}\n - {letter_count_csv}")
 
-    # Process letter statistics
-    letter_statistics = calculate_letter_statistics(input_file)
-    write_letter_statistics_to_csv(letter_statistics, letter_count_csv)
 
-    for letter, count in letter_statistics['letter_stats'].items():
-        db_handler.insert_letter_statistics(
-            letter,
-            count,
-            letter_statistics['total_uppercase_letters'],
-            letter_statistics['uppercase_percentage']
-        )
+def recreate_csv_files_incremental(input_file, word_count_csv, letter_count_csv, db_handler):
+    """
+    Process only the bytes appended to the input file since the last run.
+    The running counts are kept in the database checkpoint, the CSV files are rewritten
+    from the merged state and only the new counts are added to the database tables.
+    If the file was truncated or rotated, the statistics are rebuilt from the start.
+    """
+    if not os.path.exists(input_file):
+        print(f"Error: The input file '{input_file}' does not exist. Please check the file path.")
+        return
+
+    # Ensure output directory exists
+    output_dir = os.path.dirname(word_count_csv)
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    word_delta, char_delta = Counter(), Counter()
+    checkpoint = db_handler.load_checkpoint(input_file)
+    if checkpoint is not None and not checkpoint_is_valid(input_file, checkpoint):
+        # The counts of the old file content leave the database totals
+        word_delta.subtract(checkpoint['word_count'])
+        char_delta.subtract(checkpoint['char_counts'])
+        checkpoint = None
+
+    if checkpoint is None:
+        checkpoint = {'byte_offset': 0, 'word_count': Counter(), 'char_counts': Counter()}
+
+    print(f"Processing file: {input_file} from byte {checkpoint['byte_offset']}")
+    new_word_count, new_char_counts, end_offset = analyze_file_range(input_file, checkpoint['byte_offset'])
+
+    word_count = checkpoint['word_count']
+    word_count.update(new_word_count)
+    char_counts = checkpoint['char_counts']
+    char_counts.update(new_char_counts)
+
+    write_word_count_to_csv(word_count, word_count_csv)
+    write_letter_statistics_to_csv(build_letter_statistics(char_counts), letter_count_csv)
+    word_delta.update(new_word_count)
+    char_delta.update(new_char_counts)
+    # Statistics and checkpoint are committed together, so a crash cannot count the new bytes twice
+    with db_handler.transaction():
+        save_statistics_delta(db_handler, word_delta, char_delta)
+        db_handler.save_checkpoint(input_file, end_offset, file_head_digest(input_file, end_offset),
+                                   word_count, char_counts)
+
+    print(f"Files created:\n - {word_count_csv}\n - {letter_count_csv}")
+
+
+def recreate_csv_files_segmented(segment_paths, word_count_csv, letter_count_csv, db_handler):
+    """
+    Build the statistics of a feed split into segments (see SegmentedFeed in Homework_6), one checkpoint per segment.
+    Segments whose checkpoint covers the whole file are not scanned again, segments that grew are analyzed
+    from their checkpoint and segments rewritten by compaction are rebuilt. The CSV files are written from
+    the merged totals and the database tables receive only the change of the counts.
+    :param segment_paths: Paths of the segment files, oldest first.
+    :param word_count_csv: Path of the word count CSV file.
+    :param letter_count_csv: Path of the letter statistics CSV file.
+    :param db_handler: DatabaseHandler holding the checkpoints and the statistics tables.
+    :return: Number of segments served from their checkpoint without scanning.
+    """
+    output_dir = os.path.dirname(word_count_csv)
+    if output_dir and not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    word_count, char_counts = Counter(), Counter()
+    word_delta, char_delta = Counter(), Counter()
+    checkpoints = []
+    cached_segments = 0
+    for segment_path in segment_paths:
+        checkpoint = db_handler.load_checkpoint(segment_path)
+        if checkpoint is not None and os.path.getsize(segment_path) == checkpoint['byte_offset'] \
+                and file_head_digest(segment_path, checkpoint['byte_offset']) == checkpoint['head_digest']:
+            word_count.update(checkpoint['word_count'])
+            char_counts.update(checkpoint['char_counts'])
+            cached_segments += 1
+            continue
+
+        start = 0
+        segment_words, segment_chars = Counter(), Counter()
+        if checkpoint is not None:
+            if checkpoint_is_valid(segment_path, checkpoint):
+                start = checkpoint['byte_offset']
+                segment_words, segment_chars = checkpoint['word_count'], checkpoint['char_counts']
+            else:
+                # The counts of the old segment content leave the database totals
+                word_delta.subtract(checkpoint['word_count'])
+                char_delta.subtract(checkpoint['char_counts'])
+
+        print(f"Processing segment: {segment_path} from byte {start}")
+        new_word_count, new_char_counts, end_offset = analyze_file_range(segment_path, start)
+        segment_words.update(new_word_count)
+        segment_chars.update(new_char_counts)
+        word_delta.update(new_word_count)
+        char_delta.update(new_char_counts)
+        checkpoints.append((segment_path, end_offset, file_head_digest(segment_path, end_offset),
+                            segment_words, segment_chars))
+        word_count.update(segment_words)
+        char_counts.update(segment_chars)
+
+    write_word_count_to_csv(word_count, word_count_csv)
+    write_letter_statistics_to_csv(build_letter_statistics(char_counts), letter_count_csv)
+
+    # Statistics and checkpoints are committed together, so a crash cannot count a segment twice
+    with db_handler.transaction():
+        save_statistics_delta(db_handler, word_delta, char_delta)
+        for checkpoint in checkpoints:
+            db_handler.save_checkpoint(*checkpoint)
 
+    print(f"{cached_segments} of {len(segment_paths)} segments served from cache.")
     print(f"Files created:\n - {word_count_csv}\n - {letter_count_csv}")
+    return cached_segments
 
 
 if __name__ == "__main__":
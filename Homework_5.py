@@ -1,23 +1,115 @@
 import datetime
+import os
+import threading
+import time
+
+
+class FeedWriter:
+    DURABILITY_LEVELS = ('none', 'fsync')
+
+    def __init__(self, file_path, flush_records=1000, flush_interval_ms=None, durability='none'):
+        if durability not in self.DURABILITY_LEVELS:
+            raise ValueError(f"Unknown durability level '{durability}'. Use one of {self.DURABILITY_LEVELS}.")
+        self.file_path = file_path
+        self.flush_records = flush_records
+        self.flush_interval_ms = flush_interval_ms
+        self.durability = durability
+        self.buffer = []
+        self.file = None
+        self.last_flush = time.monotonic()
+        self.lock = threading.RLock()
+        self.stop_event = threading.Event()
+        self.flush_thread = None
+
+    def open(self):
+        with self.lock:
+            if self.file is None:
+                self.file = open(self.file_path, 'a', encoding='utf-8')
+                self.last_flush = time.monotonic()
+            if self.flush_interval_ms is not None and self.flush_thread is None:
+                self.stop_event.clear()
+                self.flush_thread = threading.Thread(target=self.flush_stale_records, name='feed-flush', daemon=True)
+                self.flush_thread.start()
+        return self
+
+    def flush_stale_records(self):
+        # Background loop: flush buffered records once they waited flush_interval_ms, even if no new record arrives
+        interval = self.flush_interval_ms / 1000
+        while True:
+            with self.lock:
+                remaining = interval - (time.monotonic() - self.last_flush)
+                if self.buffer and self.file is not None and remaining <= 0:
+                    self.flush()
+                    remaining = interval
+            if self.stop_event.wait(remaining if remaining > 0 else interval):
+                break
+
+    def write(self, record):
+        self.write_many([record])
+
+    def write_many(self, records):
+        # Queue published records and flush once if the policy says so
+        with self.lock:
+            self.buffer.extend(record.publish() + '\n' for record in records)
+            if self.flush_records and len(self.buffer) >= self.flush_records:
+                self.flush()
+            elif (self.flush_interval_ms is not None
+                  and (time.monotonic() - self.last_flush) * 1000 >= self.flush_interval_ms):
+                self.flush()
+
+    def flush(self):
+        # Write all buffered records with a single write call
+        with self.lock:
+            self.open()
+            if self.buffer:
+                self.file.write(''.join(self.buffer))
+                self.buffer.clear()
+            self.file.flush()
+            if self.durability == 'fsync':
+                os.fsync(self.file.fileno())
+            self.last_flush = time.monotonic()
+
+    def close(self):
+        with self.lock:
+            if self.file is not None or self.buffer:
+                self.flush()
+                self.file.close()
+                self.file = None
+        # Stop the flush thread outside the lock, it may be waiting for it
+        self.stop_event.set()
+        if self.flush_thread is not None:
+            self.flush_thread.join()
+            self.flush_thread = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
 
 class NewsFeed:
     FILE_PATH = r'C:\SwissRE\DynamicSeries\Pandas_Select\Homework_5.txt'
 
-    def __init__(self):
+    def __init__(self, writer=None):
         self.records = []
+        self.writer = writer
 
     def add_record(self, record):
         self.records.append(record)
 
     def save_to_file(self):
-        with open(self.FILE_PATH, 'a', encoding='utf-8') as file:
-            for record in self.records:
-                file.write(record.publish() + '\n')
+        if self.writer is not None:
+            self.writer.write_many(self.records)
+        else:
+            with open(self.FILE_PATH, 'a', encoding='utf-8') as file:
+                file.write(''.join(record.publish() + '\n' for record in self.records))
         self.records.clear()
 
 
 class Record:
+    __slots__ = ('text',)
+
     def __init__(self, text):
         self.text = text
 
@@ -26,6 +118,8 @@ class Record:
 
 
 class News(Record):
+    __slots__ = ('city', 'publish_date')
+
     def __init__(self, text, city):
         super().__init__(text)
         self.city = city
@@ -36,10 +130,15 @@ class News(Record):
 
 
 class PrivateAd(Record):
+    __slots__ = ('expiration_date',)
+
     def __init__(self, text, expiration_date):
         super().__init__(text)
         self.expiration_date = expiration_date
-        self.days_left = (self.expiration_date - datetime.datetime.now()).days
+
+    @property
+    def days_left(self):
+        return (self.expiration_date - datetime.datetime.now()).days
 
     def publish(self):
         return (f"Private Ad:\n{self.text}\nExpiration date: {self.expiration_date.strftime('%Y-%m-%d')}\n"
@@ -47,6 +146,8 @@ class PrivateAd(Record):
 
 
 class MotivationalQuote(Record):  # Унікальний тип публікації
+    __slots__ = ('author', 'publish_time')
+
     def __init__(self, text, author):
         super().__init__(text)
         self.author = author
@@ -67,40 +168,46 @@ def get_valid_date(prompt):
 
 
 def main():
-    feed = NewsFeed()
-    while True:
-        print("\nSelect type of record to add:")
-        print("1. News")
-        print("2. Private Ad")
-        print("3. Motivational Quote")
-        print("4. Exit")
-        choice = input("Enter your choice: ")
-
-        if choice == '1':
-            text = input("Enter the news text: ")
-            city = input("Enter the city: ")
-            feed.add_record(News(text, city))
-
-        elif choice == '2':
-            text = input("Enter the private ad text: ")
-            expiration_date = get_valid_date("Enter the expiration date (YYYY-MM-DD): ")
-            feed.add_record(PrivateAd(text, expiration_date))
-
-        elif choice == '3':
-            text = input("Enter the motivational quote text: ")
-            author = input("Enter the author of the quote: ")
-            feed.add_record(MotivationalQuote(text, author))
-
-        elif choice == '4':
-            print("Exiting program.")
-            break
-
-        else:
-            print("Invalid input. Please try again.")
-            continue
-
-        feed.save_to_file()
-        print("Record saved successfully!")
+    # Keep the feed file open for the whole session; every saved record is flushed right away
+    writer = FeedWriter(NewsFeed.FILE_PATH, flush_records=1)
+    feed = NewsFeed(writer)
+
+    try:
+        while True:
+            print("\nSelect type of record to add:")
+            print("1. News")
+            print("2. Private Ad")
+            print("3. Motivational Quote")
+            print("4. Exit")
+            choice = input("Enter your choice: ")
+
+            if choice == '1':
+                text = input("Enter the news text: ")
+                city = input("Enter the city: ")
+                feed.add_record(News(text, city))
+
+            elif choice == '2':
+                text = input("Enter the private ad text: ")
+                expiration_date = get_valid_date("Enter the expiration date (YYYY-MM-DD): ")
+                feed.add_record(PrivateAd(text, expiration_date))
+
+            elif choice == '3':
+                text = input("Enter the motivational quote text: ")
+                author = input("Enter the author of the quote: ")
+                feed.add_record(MotivationalQuote(text, author))
+
+            elif choice == '4':
+                print("Exiting program.")
+                break
+
+            else:
+                print("Invalid input. Please try again.")
+                continue
+
+            feed.save_to_file()
+            print("Record saved successfully!")
+    finally:
+        writer.close()
 
 
 if __name__ == '__main__':
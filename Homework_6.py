@@ -1,13 +1,132 @@
+import asyncio
 import datetime
+import io
+import itertools
+import json
 import os
+import re
+import sqlite3
+import string
+import struct
+import threading
+import time
+import tracemalloc
+
+
+class FeedWriter:
+    # Long-lived writer that keeps the feed file open and writes published records in batches.
+    # Flush policy: every `flush_records` records, every `flush_interval_ms` milliseconds
+    # (a background thread flushes records that waited that long) or on an explicit flush()/close().
+    # Durability: 'none' leaves the data to the OS, 'fsync' calls os.fsync after every flush.
+    DURABILITY_LEVELS = ('none', 'fsync')
+
+    def __init__(self, file_path, flush_records=1000, flush_interval_ms=None, durability='none'):
+        if durability not in self.DURABILITY_LEVELS:
+            raise ValueError(f"Unknown durability level '{durability}'. Use one of {self.DURABILITY_LEVELS}.")
+        self.file_path = file_path
+        self.flush_records = flush_records
+        self.flush_interval_ms = flush_interval_ms
+        self.durability = durability
+        self.buffer = []
+        self.file = None
+        self.last_flush = time.monotonic()
+        self.lock = threading.RLock()
+        self.stop_event = threading.Event()
+        self.flush_thread = None
+
+    def open(self):
+        with self.lock:
+            if self.file is None:
+                self.file = open(self.file_path, 'a', encoding='utf-8')
+                self.last_flush = time.monotonic()
+            if self.flush_interval_ms is not None and self.flush_thread is None:
+                self.stop_event.clear()
+                self.flush_thread = threading.Thread(target=self.flush_stale_records, name='feed-flush', daemon=True)
+                self.flush_thread.start()
+        return self
+
+    def flush_stale_records(self):
+        # Background loop: flush buffered records once they waited flush_interval_ms, even if no new record arrives
+        interval = self.flush_interval_ms / 1000
+        while True:
+            with self.lock:
+                remaining = interval - (time.monotonic() - self.last_flush)
+                if self.buffer and self.file is not None and remaining <= 0:
+                    self.flush()
+                    remaining = interval
+            if self.stop_event.wait(remaining if remaining > 0 else interval):
+                break
+
+    @staticmethod
+    def encoded_length(text):
+        # Number of bytes a text takes in the feed file once newlines are translated
+        return len(text.encode('utf-8')) + text.count('\n') * (len(os.linesep) - 1)
+
+    def pending_bytes(self):
+        # Number of bytes buffered but not written to the file yet
+        with self.lock:
+            return sum(self.encoded_length(text) for text in self.buffer)
+
+    def write(self, record):
+        self.write_many([record])
+
+    def write_many(self, records):
+        now = datetime.datetime.now()
+        self.write_published([record.render(now) + '\n' for record in records])
+
+    def write_published(self, texts):
+        # Queue already published records and flush once if the policy says so
+        with self.lock:
+            self.buffer.extend(texts)
+            if self.flush_records and len(self.buffer) >= self.flush_records:
+                self.flush()
+            elif (self.flush_interval_ms is not None
+                  and (time.monotonic() - self.last_flush) * 1000 >= self.flush_interval_ms):
+                self.flush()
+
+    def flush(self):
+        # Write all buffered records with a single write call
+        with self.lock:
+            self.open()
+            if self.buffer:
+                self.file.write(''.join(self.buffer))
+                self.buffer.clear()
+            self.file.flush()
+            if self.durability == 'fsync':
+                os.fsync(self.file.fileno())
+            self.last_flush = time.monotonic()
+
+    def close(self):
+        with self.lock:
+            if self.file is not None or self.buffer:
+                self.flush()
+                self.file.close()
+                self.file = None
+        # Stop the flush thread outside the lock, it may be waiting for it
+        self.stop_event.set()
+        if self.flush_thread is not None:
+            self.flush_thread.join()
+            self.flush_thread = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
 
 class NewsFeed:
     # File path for storing records
     FILE_PATH = r'C:\SwissRE\DynamicSeries\Pandas_Select\Homework_5.txt'
 
-    def __init__(self):
+    def __init__(self, writer=None, store=None, index=None):
+        # Optional FeedWriter that keeps the file open between saves
         self.records = []
+        self.writer = writer
+        # Optional record store (BinaryFeedStore or SQLiteFeedStore) that receives every saved record
+        self.store = store
+        # Optional FeedIndex of the text file, extended with every save
+        self.index = index
 
     def add_record(self, record):
         # Add a record to the feed
@@ -15,63 +134,900 @@ class NewsFeed:
 
     def save_to_file(self):
         # Save all records to the text file
-        with open(self.FILE_PATH, 'a', encoding='utf-8') as file:
-            for record in self.records:
-                file.write(record.publish() + '\n')
+        now = datetime.datetime.now()
+        texts = [record.render(now) + '\n' for record in self.records]
+        if self.writer is not None:
+            self.writer.write_published(texts)
+        else:
+            with open(self.FILE_PATH, 'a', encoding='utf-8') as file:
+                file.write(''.join(texts))
+        if self.index is not None and self.records:
+            pending_bytes = self.writer.pending_bytes() if self.writer is not None else 0
+            self.index.add(self.records, texts, pending_bytes)
+        if self.store is not None and self.records:
+            self.store.append(self.records)
         # Clear processed records to avoid duplication
         self.records.clear()
 
 
+# Separator line closing every published record
+SEPARATOR = '-' * 50
+
+
 class Record:
-    # Base class for all record types
+    # Base class for all record types; __slots__ keeps every record small (no per-instance __dict__).
+    # Each subclass has a TEMPLATE (built once per class, separator included) and fills it
+    # through template_fields(now), so time-dependent values are computed when the record is rendered.
+    __slots__ = ('text',)
+    TEMPLATE = None
+
     def __init__(self, text):
         self.text = text
 
+    def template_fields(self, now):
+        # Template fields must be implemented in derived classes
+        raise NotImplementedError("template_fields method must be implemented in subclasses")
+
+    def render(self, now=None):
+        return self.TEMPLATE.format(*self.template_fields(now or datetime.datetime.now()))
+
     def publish(self):
-        # Publish must be implemented in derived classes
-        raise NotImplementedError("Publish method must be implemented in subclasses")
+        return self.render()
 
 
 class News(Record):
     # News class with text, city, and a calculated publish date
-    def __init__(self, text, city):
+    __slots__ = ('city', 'published_at')
+    TEMPLATE = 'News:\n{}\nCity: {}\nPublished at: {}\n' + SEPARATOR
+
+    def __init__(self, text, city, published_at=None):
         super().__init__(text)
         self.city = city
-        self.publish_date = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.published_at = published_at or datetime.datetime.now().replace(microsecond=0)
 
-    def publish(self):
-        return f"News:\n{self.text}\nCity: {self.city}\nPublished at: {self.publish_date}\n{'-'*50}"
+    @property
+    def publish_date(self):
+        return self.published_at.strftime('%Y-%m-%d %H:%M:%S')
+
+    def template_fields(self, now):
+        return self.text, self.city, self.publish_date
 
 
 class PrivateAd(Record):
-    # Private Ad class with text, expiration date, and days left
+    # Private Ad class with text, expiration date, and days left (computed when asked for)
+    __slots__ = ('expiration_date',)
+    TEMPLATE = 'Private Ad:\n{}\nExpiration date: {}\nDays left: {}\n' + SEPARATOR
+
     def __init__(self, text, expiration_date):
         super().__init__(text)
         self.expiration_date = expiration_date
-        self.days_left = (self.expiration_date - datetime.datetime.now()).days
 
-    def publish(self):
-        return (f"Private Ad:\n{self.text}\nExpiration date: {self.expiration_date.strftime('%Y-%m-%d')}\n"
-                f"Days left: {self.days_left}\n{'-'*50}")
+    def days_left_at(self, now):
+        return (self.expiration_date - now).days
+
+    @property
+    def days_left(self):
+        return self.days_left_at(datetime.datetime.now())
+
+    def template_fields(self, now):
+        return self.text, self.expiration_date.strftime('%Y-%m-%d'), self.days_left_at(now)
 
 
 class MotivationalQuote(Record):
     # Motivational Quote with a quote and author
-    def __init__(self, text, author):
+    __slots__ = ('author', 'published_at')
+    TEMPLATE = 'Motivational Quote:\n"{}" - {}\nPublished at: {}\n' + SEPARATOR
+
+    def __init__(self, text, author, published_at=None):
         super().__init__(text)
         self.author = author
-        self.publish_time = datetime.datetime.now().strftime('%H:%M:%S')
+        self.published_at = published_at or datetime.datetime.now().replace(microsecond=0)
 
-    def publish(self):
-        return f"Motivational Quote:\n\"{self.text}\" - {self.author}\nPublished at: {self.publish_time}\n{'-'*50}'"
+    @property
+    def publish_time(self):
+        return self.published_at.strftime('%H:%M:%S')
+
+    def template_fields(self, now):
+        return self.text, self.author, self.publish_time
+
+
+def render_many(records, out=None, now=None):
+    # Render records one after another into a single buffer, each followed by a newline.
+    # All records share one `now`, so days_left is consistent across the export.
+    # With `out` (any object with write(), e.g. an open file) the text is streamed there and None is returned;
+    # otherwise the rendered text is returned as one string.
+    now = now or datetime.datetime.now()
+    buffer = io.StringIO() if out is None else out
+    write = buffer.write
+    for record in records:
+        write(record.TEMPLATE.format(*record.template_fields(now)))
+        write('\n')
+    return buffer.getvalue() if out is None else None
+
+
+class BinaryFeedStore:
+    # Compact binary copy of the feed, kept next to the text file.
+    # The file starts with MAGIC, followed by one frame per record:
+    #   header: payload length (uint32), type tag (uint8), epoch timestamp (float64)
+    #   payload: the text fields, each as a uint32 length followed by UTF-8 bytes
+    # The timestamp is the publish time (News, MotivationalQuote) or the expiration date (PrivateAd),
+    # so records can be filtered by type and time without decoding their text.
+    MAGIC = b'NFB1'
+    HEADER = struct.Struct('<IBd')
+    FIELD_LENGTH = struct.Struct('<I')
+    TYPE_TAGS = {News: 1, PrivateAd: 2, MotivationalQuote: 3}
+    READ_BUFFER = 1024 * 1024
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+
+    @classmethod
+    def encode(cls, record):
+        # Return the frame of one record
+        if isinstance(record, News):
+            timestamp, fields = record.published_at.timestamp(), (record.text, record.city)
+        elif isinstance(record, PrivateAd):
+            timestamp, fields = record.expiration_date.timestamp(), (record.text,)
+        elif isinstance(record, MotivationalQuote):
+            timestamp, fields = record.published_at.timestamp(), (record.text, record.author)
+        else:
+            raise ValueError(f"Unsupported record type '{type(record).__name__}'")
+
+        payload = b''.join(cls.FIELD_LENGTH.pack(len(data)) + data for data in (field.encode('utf-8') for field in fields))
+        return cls.HEADER.pack(len(payload), cls.TYPE_TAGS[type(record)], timestamp) + payload
+
+    @classmethod
+    def decode(cls, type_tag, timestamp, payload):
+        # Rebuild a record from its type tag, timestamp and payload
+        fields = []
+        position = 0
+        while position < len(payload):
+            (length,) = cls.FIELD_LENGTH.unpack_from(payload, position)
+            position += cls.FIELD_LENGTH.size
+            fields.append(bytes(payload[position:position + length]).decode('utf-8'))
+            position += length
+
+        moment = datetime.datetime.fromtimestamp(timestamp)
+        if type_tag == 1:
+            return News(fields[0], fields[1], published_at=moment)
+        elif type_tag == 2:
+            return PrivateAd(fields[0], moment)
+        elif type_tag == 3:
+            return MotivationalQuote(fields[0], fields[1], published_at=moment)
+        raise ValueError(f"Unknown record type tag {type_tag}")
+
+    def append(self, records):
+        # Append records with a single write
+        data = b''.join(self.encode(record) for record in records)
+        with open(self.file_path, 'ab') as file:
+            if file.tell() == 0:
+                file.write(self.MAGIC)
+            file.write(data)
+
+    def iter_records(self, record_types=None, since=None, until=None):
+        # Yield the stored records, optionally only the given types and timestamps in [since, until).
+        # Frames that do not match are skipped without decoding their payload.
+        type_tags = {self.TYPE_TAGS[record_type] for record_type in record_types} if record_types else None
+        since = since.timestamp() if since else None
+        until = until.timestamp() if until else None
+
+        with open(self.file_path, 'rb') as file:
+            if file.read(len(self.MAGIC)) != self.MAGIC:
+                raise ValueError(f"'{self.file_path}' is not a binary feed file.")
+
+            buffer = b''
+            while True:
+                chunk = file.read(self.READ_BUFFER)
+                if not chunk:
+                    break
+                buffer = buffer + chunk if buffer else chunk
+                view = memoryview(buffer)
+                position = 0
+                while position + self.HEADER.size <= len(buffer):
+                    length, type_tag, timestamp = self.HEADER.unpack_from(buffer, position)
+                    end = position + self.HEADER.size + length
+                    if end > len(buffer):
+                        break
+                    if ((type_tags is None or type_tag in type_tags)
+                            and (since is None or timestamp >= since)
+                            and (until is None or timestamp < until)):
+                        yield self.decode(type_tag, timestamp, view[position + self.HEADER.size:end])
+                    position = end
+                view.release()
+                buffer = buffer[position:]
+
+            if buffer:
+                raise ValueError(f"'{self.file_path}' ends with an incomplete record.")
+
+
+def iter_text_feed(file_path):
+    # Parse the human-readable feed file back into records (the slow path the binary store replaces).
+    # Motivational quotes only store the time of day in the text, so today's date is assumed for them.
+    with open(file_path, 'r', encoding='utf-8') as file:
+        block = []
+        for line in file:
+            line = line.rstrip('\n')
+            if not line.startswith(SEPARATOR):
+                block.append(line)
+                continue
+            if block:
+                yield parse_text_block(block)
+            block = []
+
+
+def parse_text_block(lines):
+    # Build a record from the lines of one published text block
+    header, body = lines[0], lines[1:]
+    if header == 'News:':
+        published_at = datetime.datetime.strptime(body[-1][len('Published at: '):], '%Y-%m-%d %H:%M:%S')
+        return News('\n'.join(body[:-2]), body[-2][len('City: '):], published_at=published_at)
+    elif header == 'Private Ad:':
+        expiration_date = datetime.datetime.strptime(body[-2][len('Expiration date: '):], '%Y-%m-%d')
+        return PrivateAd('\n'.join(body[:-2]), expiration_date)
+    elif header == 'Motivational Quote:':
+        quote = '\n'.join(body[:-1])
+        text, _, author = quote.rpartition('" - ')
+        published_time = datetime.datetime.strptime(body[-1][len('Published at: '):], '%H:%M:%S').time()
+        return MotivationalQuote(text[1:], author, published_at=datetime.datetime.combine(datetime.date.today(), published_time))
+    raise ValueError(f"Unknown record header '{header}'")
+
+
+def benchmark_feed_formats(text_path, binary_path, record_count=1_000_000):
+    # Compare loading, filtering and re-rendering the text feed and the binary store.
+    # Prints time and peak Python memory (tracemalloc) for both; the generated files are removed.
+    now = datetime.datetime.now().replace(microsecond=0)
+    records = []
+    for i in range(record_count):
+        if i % 3 == 0:
+            records.append(News(f"News number {i} about the weather", 'Kyiv' if i % 2 else 'Lviv',
+                                published_at=now - datetime.timedelta(minutes=i)))
+        elif i % 3 == 1:
+            records.append(PrivateAd(f"Selling item number {i}", now + datetime.timedelta(days=i % 400)))
+        else:
+            records.append(MotivationalQuote(f"Quote number {i}", 'Author'))
+
+    with open(text_path, 'w', encoding='utf-8') as file:
+        render_many(records, out=file)
+    BinaryFeedStore(binary_path).append(records)
+    del records
+    print(f"Text feed: {os.path.getsize(text_path) / 1024 / 1024:.1f} MiB, "
+          f"binary feed: {os.path.getsize(binary_path) / 1024 / 1024:.1f} MiB")
+
+    week_ago = now - datetime.timedelta(days=7)
+    loaders = {
+        'text': lambda: [record.publish() for record in iter_text_feed(text_path)
+                         if isinstance(record, News) and record.published_at >= week_ago],
+        'binary': lambda: [record.publish() for record in
+                           BinaryFeedStore(binary_path).iter_records(record_types=[News], since=week_ago)],
+    }
+    results = {}
+    for label, loader in loaders.items():
+        start_time = time.perf_counter()
+        rendered = loader()
+        elapsed = time.perf_counter() - start_time
+
+        tracemalloc.start()
+        loader()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        results[label] = {'seconds': elapsed, 'peak_bytes': peak_memory, 'matches': len(rendered)}
+        print(f"{label}: {len(rendered)} news from the last week in {elapsed:.2f}s, "
+              f"peak memory {peak_memory / 1024 / 1024:.1f} MiB")
+
+    os.remove(text_path)
+    os.remove(binary_path)
+    return results
+
+
+class FeedIndex:
+    # Sidecar SQLite index of the text feed: one row per record with its byte offset and length,
+    # the record type, News.city, the publish time and PrivateAd.expiration_date.
+    # Only bytes that are on disk are indexed: NewsFeed.save_to_file() calls add(), which indexes the saved
+    # records directly when they are the only new bytes in the file, and otherwise falls back to catch_up(),
+    # which parses whatever other writers (or a FeedWriter flush) appended. Records still buffered in a
+    # FeedWriter are indexed by the first add()/catch_up()/query() after they are flushed.
+    # Offsets are computed for text mode, where every '\n' is written as os.linesep.
+    SEPARATOR_BYTES = SEPARATOR.encode('ascii')
+    RECORD_TYPES = {News: 'news', PrivateAd: 'ad', MotivationalQuote: 'quote'}
+
+    def __init__(self, feed_path, index_path=None):
+        self.feed_path = feed_path
+        self.index_path = index_path or feed_path + '.idx'
+        self.conn = sqlite3.connect(self.index_path)
+        self.cursor = self.conn.cursor()
+        self._create_tables()
+        self.catch_up()
+
+    def _create_tables(self):
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS feed_index (
+                offset INTEGER PRIMARY KEY,
+                length INTEGER NOT NULL,
+                record_type TEXT NOT NULL,
+                city TEXT,
+                published_at REAL,
+                expiration_date REAL
+            )
+        """)
+        self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS feed_index_published
+            ON feed_index (record_type, city, published_at)
+        """)
+        self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS feed_index_expiration
+            ON feed_index (expiration_date) WHERE expiration_date IS NOT NULL
+        """)
+        self.cursor.execute("CREATE TABLE IF NOT EXISTS feed_index_state (id INTEGER PRIMARY KEY CHECK (id = 1), end_offset INTEGER NOT NULL)")
+        self.cursor.execute("INSERT OR IGNORE INTO feed_index_state (id, end_offset) VALUES (1, 0)")
+        self.conn.commit()
+
+    @property
+    def end_offset(self):
+        # Byte offset right after the last indexed record
+        return self.cursor.execute("SELECT end_offset FROM feed_index_state WHERE id = 1").fetchone()[0]
+
+    @classmethod
+    def index_row(cls, record, offset, length):
+        city = published_at = expiration_date = None
+        if isinstance(record, News):
+            city, published_at = record.city, record.published_at.timestamp()
+        elif isinstance(record, PrivateAd):
+            expiration_date = record.expiration_date.timestamp()
+        elif isinstance(record, MotivationalQuote):
+            published_at = record.published_at.timestamp()
+        return (offset, length, cls.RECORD_TYPES[type(record)], city, published_at, expiration_date)
+
+    def _store(self, rows, end_offset):
+        self.cursor.executemany("""
+            INSERT OR REPLACE INTO feed_index (offset, length, record_type, city, published_at, expiration_date)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, rows)
+        self.cursor.execute("UPDATE feed_index_state SET end_offset = ? WHERE id = 1", (end_offset,))
+        self.conn.commit()
+
+    def feed_size(self):
+        return os.path.getsize(self.feed_path) if os.path.exists(self.feed_path) else 0
+
+    def add(self, records, texts, pending_bytes=0):
+        # Index records that were just saved to the feed as `texts` (their published form).
+        # pending_bytes is what the feed's FeedWriter still buffers (these texts included).
+        lengths = [FeedWriter.encoded_length(text) for text in texts]
+        if pending_bytes or self.end_offset + sum(lengths) != self.feed_size():
+            # The texts are not (all) on disk yet or something else appended to the feed:
+            # index what is on disk now, the rest is picked up once it is written
+            self.catch_up()
+            return
+
+        offset = self.end_offset
+        rows = []
+        for record, length in zip(records, lengths):
+            rows.append(self.index_row(record, offset, length))
+            offset += length
+        self._store(rows, offset)
+
+    def catch_up(self):
+        # Index records appended to the feed after end_offset (or the whole feed for a new index).
+        # If the feed shrank (rewritten or replaced), the index is rebuilt from the start.
+        # Blocks that cannot be parsed are skipped.
+        offset = self.end_offset
+        feed_size = self.feed_size()
+        if feed_size < offset:
+            self.cursor.execute("DELETE FROM feed_index")
+            offset = 0
+        if feed_size <= offset:
+            self._store([], offset)
+            return 0
+
+        rows = []
+        with open(self.feed_path, 'rb') as file:
+            file.seek(offset)
+            start, lines = offset, []
+            for line in file:
+                offset += len(line)
+                if not line.startswith(self.SEPARATOR_BYTES):
+                    lines.append(line.decode('utf-8', errors='replace').rstrip('\r\n'))
+                    continue
+                if lines:
+                    try:
+                        rows.append(self.index_row(parse_text_block(lines), start, offset - start))
+                    except (ValueError, IndexError) as e:
+                        print(f"Skipping unreadable feed block at byte {start}: {e}")
+                start, lines = offset, []
+        # A trailing block without its separator is still being written and is left for the next call
+        self._store(rows, start)
+        return len(rows)
+
+    def query(self, record_type=None, city=None, published_since=None, published_until=None,
+              expires_after=None, expires_before=None):
+        # Yield the records matching all given conditions in feed order.
+        # record_type is a record class; time bounds are datetimes, lower bounds inclusive and upper bounds exclusive.
+        # Records that cannot be read back (the feed changed under the index) are skipped.
+        self.catch_up()
+        conditions, params = [], []
+        if record_type is not None:
+            conditions.append("record_type = ?")
+            params.append(self.RECORD_TYPES[record_type])
+        if city is not None:
+            conditions.append("city = ?")
+            params.append(city)
+        for column, operator, value in (('published_at', '>=', published_since), ('published_at', '<', published_until),
+                                        ('expiration_date', '>=', expires_after), ('expiration_date', '<', expires_before)):
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                params.append(value.timestamp())
+
+        sql = "SELECT offset, length FROM feed_index"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY offset"
+
+        with open(self.feed_path, 'rb') as file:
+            for offset, length in self.conn.execute(sql, params):
+                file.seek(offset)
+                data = file.read(length)
+                try:
+                    if len(data) < length:
+                        raise ValueError("record ends past the end of the feed")
+                    lines = data.decode('utf-8').replace('\r\n', '\n').split('\n')
+                    record = parse_text_block(lines[:-2])
+                except (ValueError, IndexError) as e:
+                    print(f"Skipping unreadable feed block at byte {offset}: {e}")
+                    continue
+                yield record
+
+    def news_from_city(self, city, days=7):
+        # All news from `city` published in the last `days` days
+        since = datetime.datetime.now() - datetime.timedelta(days=days)
+        return self.query(record_type=News, city=city, published_since=since)
+
+    def ads_expiring_within(self, days=7):
+        # All ads that have not expired yet but will within `days` days
+        now = datetime.datetime.now()
+        return self.query(record_type=PrivateAd, expires_after=now, expires_before=now + datetime.timedelta(days=days))
+
+    def close(self):
+        self.conn.close()
+
+
+def preprocess_text(text):
+    # Convert text to lowercase and remove punctuation (the word rule of the statistics in Homework_7-10)
+    return text.lower().translate(str.maketrans("", "", string.punctuation)).strip()
+
+
+class SQLiteFeedStore:
+    # Typed SQLite table of feed records with two FTS5 indexes kept in sync by triggers:
+    # - feed_records_fts on the record text (unicode61 tokenizer) for keyword search;
+    # - feed_words_fts on the `words` column, the published block of the record as calculate_word_count
+    #   sees it (header, city/author and date lines included) after preprocess_text. Its tokenizer only
+    #   splits on the spaces left in there, so word_counts() gives the same words and counts as
+    #   word-count.csv ("Don't" is "dont") without re-tokenizing the text feed.
+    # `words` is rendered when the record is stored, so a PrivateAd's "Days left" is the value on that day.
+    # Records are inserted in batched transactions.
+    RECORD_TYPES = {News: 'news', PrivateAd: 'ad', MotivationalQuote: 'quote'}
+
+    def __init__(self, db_path, batch_size=10000, journal_mode='WAL', synchronous='NORMAL'):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(f"PRAGMA journal_mode = {journal_mode}")
+        self.conn.execute(f"PRAGMA synchronous = {synchronous}")
+        self._create_tables()
+
+    def _create_tables(self):
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS feed_records (
+                    id INTEGER PRIMARY KEY,
+                    record_type TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    city TEXT,
+                    author TEXT,
+                    published_at REAL,
+                    expiration_date REAL,
+                    words TEXT NOT NULL DEFAULT ''
+                )
+            """)
+            columns = [column[1] for column in self.conn.execute("PRAGMA table_info(feed_records)")]
+            migrate_words = 'words' not in columns
+            if migrate_words:
+                # Stores created before the words index: add the column, the triggers are recreated below
+                self.conn.execute("ALTER TABLE feed_records ADD COLUMN words TEXT NOT NULL DEFAULT ''")
+                self.conn.execute("DROP TRIGGER IF EXISTS feed_records_fts_insert")
+                self.conn.execute("DROP TRIGGER IF EXISTS feed_records_fts_delete")
+            self.conn.execute("""
+                CREATE INDEX IF NOT EXISTS feed_records_published
+                ON feed_records (record_type, city, published_at)
+            """)
+            self.conn.execute("""
+                CREATE INDEX IF NOT EXISTS feed_records_expiration
+                ON feed_records (expiration_date) WHERE expiration_date IS NOT NULL
+            """)
+            # External-content FTS table: the text is stored once, in feed_records
+            self.conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS feed_records_fts
+                USING fts5(text, content='feed_records', content_rowid='id')
+            """)
+            self.conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS feed_records_vocab
+                USING fts5vocab(feed_records_fts, 'row')
+            """)
+            # The words are already lowercase and without ASCII punctuation; the ascii tokenizer keeps
+            # non-ASCII characters inside words and only splits on the spaces between them
+            self.conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS feed_words_fts
+                USING fts5(words, content='feed_records', content_rowid='id', tokenize='ascii')
+            """)
+            self.conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS feed_words_vocab
+                USING fts5vocab(feed_words_fts, 'row')
+            """)
+            self.conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS feed_records_fts_insert AFTER INSERT ON feed_records BEGIN
+                    INSERT INTO feed_records_fts (rowid, text) VALUES (new.id, new.text);
+                    INSERT INTO feed_words_fts (rowid, words) VALUES (new.id, new.words);
+                END
+            """)
+            self.conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS feed_records_fts_delete AFTER DELETE ON feed_records BEGIN
+                    INSERT INTO feed_records_fts (feed_records_fts, rowid, text) VALUES ('delete', old.id, old.text);
+                    INSERT INTO feed_words_fts (feed_words_fts, rowid, words) VALUES ('delete', old.id, old.words);
+                END
+            """)
+            if migrate_words:
+                now = datetime.datetime.now()
+                rows = self.conn.execute("""
+                    SELECT id, record_type, text, city, author, published_at, expiration_date FROM feed_records
+                """).fetchall()
+                self.conn.executemany("UPDATE feed_records SET words = ? WHERE id = ?",
+                                      ((self.record_words(self.row_record(row[1:]), now), row[0]) for row in rows))
+                self.conn.execute("INSERT INTO feed_words_fts (feed_words_fts) VALUES ('rebuild')")
+
+    @staticmethod
+    def record_words(record, now):
+        # The words of the published record, separated by single spaces
+        return ' '.join(preprocess_text(record.render(now)).split())
+
+    @classmethod
+    def record_row(cls, record, now):
+        city = author = published_at = expiration_date = None
+        if isinstance(record, News):
+            city, published_at = record.city, record.published_at.timestamp()
+        elif isinstance(record, PrivateAd):
+            expiration_date = record.expiration_date.timestamp()
+        elif isinstance(record, MotivationalQuote):
+            author, published_at = record.author, record.published_at.timestamp()
+        return (cls.RECORD_TYPES[type(record)], record.text, city, author, published_at, expiration_date,
+                cls.record_words(record, now))
+
+    @staticmethod
+    def row_record(row):
+        record_type, text, city, author, published_at, expiration_date = row
+        if record_type == 'news':
+            return News(text, city, published_at=datetime.datetime.fromtimestamp(published_at))
+        elif record_type == 'ad':
+            return PrivateAd(text, datetime.datetime.fromtimestamp(expiration_date))
+        return MotivationalQuote(text, author, published_at=datetime.datetime.fromtimestamp(published_at))
+
+    def append(self, records):
+        # Insert records with one prepared statement per batch, each batch in its own transaction
+        now = datetime.datetime.now()
+        rows = (self.record_row(record, now) for record in records)
+        while True:
+            batch = list(itertools.islice(rows, self.batch_size))
+            if not batch:
+                break
+            with self.conn:
+                self.conn.executemany("""
+                    INSERT INTO feed_records (record_type, text, city, author, published_at, expiration_date, words)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, batch)
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM feed_records").fetchone()[0]
+
+    def search(self, query, limit=None):
+        # Yield records whose text matches an FTS5 query (e.g. 'weather', 'kyiv AND rain', 'sell*'),
+        # best matches first
+        sql = """
+            SELECT r.record_type, r.text, r.city, r.author, r.published_at, r.expiration_date
+            FROM feed_records_fts JOIN feed_records AS r ON r.id = feed_records_fts.rowid
+            WHERE feed_records_fts MATCH ?
+            ORDER BY feed_records_fts.rank
+        """
+        params = [query]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        for row in self.conn.execute(sql, params):
+            yield self.row_record(row)
+
+    def word_counts(self, limit=None):
+        # Word -> number of occurrences in the published records, most frequent first.
+        # Same words and counts as calculate_word_count over the text feed of these records.
+        sql = "SELECT term, cnt FROM feed_words_vocab ORDER BY cnt DESC, term"
+        params = []
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return dict(self.conn.execute(sql, params))
+
+    def close(self):
+        self.conn.close()
+
+
+def benchmark_sqlite_store(db_path, record_count=1_000_000, queries=('weather', 'kyiv', 'item*', 'quote AND 7*')):
+    # Measure insert rate, keyword search latency and SQL word statistics on a generated feed.
+    # The database file is removed afterwards.
+    now = datetime.datetime.now().replace(microsecond=0)
+    cities = ('Kyiv', 'Lviv', 'Odesa', 'Kharkiv')
+    topics = ('weather', 'traffic', 'football', 'elections', 'concert')
+
+    def generate_records():
+        for i in range(record_count):
+            if i % 3 == 0:
+                yield News(f"News number {i} about the {topics[i % len(topics)]} in {cities[i % len(cities)]}",
+                           cities[i % len(cities)], published_at=now - datetime.timedelta(minutes=i))
+            elif i % 3 == 1:
+                yield PrivateAd(f"Selling item number {i}", now + datetime.timedelta(days=i % 400))
+            else:
+                yield MotivationalQuote(f"Quote number {i} about {topics[i % len(topics)]}", 'Author',
+                                        published_at=now)
+
+    store = SQLiteFeedStore(db_path)
+    try:
+        start_time = time.perf_counter()
+        store.append(generate_records())
+        insert_seconds = time.perf_counter() - start_time
+        results = {'insert_seconds': insert_seconds, 'records_per_second': record_count / insert_seconds}
+        print(f"Inserted {record_count} records in {insert_seconds:.2f}s "
+              f"({results['records_per_second']:.0f} records/s)")
+
+        for query in queries:
+            start_time = time.perf_counter()
+            matches = list(store.search(query, limit=100))
+            elapsed = time.perf_counter() - start_time
+            results[query] = elapsed
+            print(f"search {query!r}: top {len(matches)} matches in {elapsed * 1000:.1f} ms")
+
+        start_time = time.perf_counter()
+        top_words = store.word_counts(limit=10)
+        results['word_counts_seconds'] = time.perf_counter() - start_time
+        print(f"Top words {list(top_words)} in {results['word_counts_seconds'] * 1000:.1f} ms")
+    finally:
+        store.close()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+    return results
+
+
+def compact_segment(file_path, now=None):
+    # Rewrite a feed file without the private ads that expired before today.
+    # The new file is written next to the old one and swapped in with an atomic rename,
+    # so readers see either the old or the new segment. Files without expired ads are left untouched,
+    # and ad blocks that cannot be parsed are kept as they are.
+    today = (now or datetime.datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+    separator = SEPARATOR.encode('ascii')
+    kept, removed = [], 0
+    with open(file_path, 'rb') as file:
+        block = []
+        for line in file:
+            block.append(line)
+            if not line.startswith(separator):
+                continue
+            if block[0].rstrip(b'\r\n') == b'Private Ad:':
+                try:
+                    lines = [block_line.decode('utf-8').rstrip('\r\n') for block_line in block[:-1]]
+                    expired = parse_text_block(lines).expiration_date < today
+                except (ValueError, IndexError) as e:
+                    print(f"Keeping unreadable ad block in '{file_path}': {e}")
+                    expired = False
+                if expired:
+                    removed += 1
+                    block = []
+                    continue
+            kept.extend(block)
+            block = []
+        # Keep an unterminated trailing block as it is
+        kept.extend(block)
+
+    if removed:
+        temp_path = file_path + '.compacting'
+        with open(temp_path, 'wb') as file:
+            file.write(b''.join(kept))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, file_path)
+    return removed
+
+
+class SegmentedFeed:
+    # Feed stored as numbered segment files in `folder` instead of one ever-growing file.
+    # New records go to the active (newest) segment; it is sealed and a new one started once it reaches
+    # max_segment_bytes or is older than max_segment_seconds. Sealed segments never get appends, so
+    # compaction can rewrite them and stats jobs can cache their results (see Homework_10).
+    # It has the FeedWriter interface, so it can be passed to NewsFeed as its writer.
+    SEGMENT_NAME = 'feed-{:06d}-{:%Y%m%d%H%M%S}.txt'
+    SEGMENT_PATTERN = re.compile(r'^feed-(\d{6})-(\d{14})\.txt$')
+
+    def __init__(self, folder, max_segment_bytes=64 * 1024 * 1024, max_segment_seconds=None, durability='none'):
+        self.folder = folder
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_seconds = max_segment_seconds
+        self.durability = durability
+        self.lock = threading.Lock()
+        self.compaction_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.compaction_thread = None
+        self.writer = None
+        os.makedirs(folder, exist_ok=True)
+
+    def segment_paths(self):
+        # All segments, oldest first; the last one is the active segment
+        names = sorted(name for name in os.listdir(self.folder) if self.SEGMENT_PATTERN.match(name))
+        return [os.path.join(self.folder, name) for name in names]
+
+    def sealed_segments(self):
+        return self.segment_paths()[:-1]
+
+    def _segment_is_full(self, segment_path):
+        if os.path.getsize(segment_path) >= self.max_segment_bytes:
+            return True
+        if self.max_segment_seconds is not None:
+            started = self.SEGMENT_PATTERN.match(os.path.basename(segment_path)).group(2)
+            age = datetime.datetime.now() - datetime.datetime.strptime(started, '%Y%m%d%H%M%S')
+            return age.total_seconds() >= self.max_segment_seconds
+        return False
+
+    def _active_writer(self):
+        # Writer of the active segment, starting a new segment when there is none or the current one is full
+        if self.writer is not None and not self._segment_is_full(self.writer.file_path):
+            return self.writer
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+        segments = self.segment_paths()
+        if segments and not self._segment_is_full(segments[-1]):
+            segment_path = segments[-1]
+        else:
+            number = int(self.SEGMENT_PATTERN.match(os.path.basename(segments[-1])).group(1)) + 1 if segments else 1
+            segment_path = os.path.join(self.folder, self.SEGMENT_NAME.format(number, datetime.datetime.now()))
+        self.writer = FeedWriter(segment_path, flush_records=1, durability=self.durability).open()
+        return self.writer
+
+    def write_many(self, records):
+        now = datetime.datetime.now()
+        self.write_published([record.render(now) + '\n' for record in records])
+
+    def write_published(self, texts):
+        # Write the records to the active segment; a batch is never split between segments
+        with self.lock:
+            self._active_writer().write_published(texts)
+
+    def pending_bytes(self):
+        with self.lock:
+            return self.writer.pending_bytes() if self.writer is not None else 0
+
+    def flush(self):
+        with self.lock:
+            if self.writer is not None:
+                self.writer.flush()
+
+    def compact(self, now=None):
+        # Remove expired private ads from all sealed segments and return how many were removed.
+        # A segment that fails is reported and skipped, the others are still compacted.
+        removed = 0
+        with self.compaction_lock:
+            for segment_path in self.sealed_segments():
+                try:
+                    removed += compact_segment(segment_path, now)
+                except Exception as e:
+                    print(f"An error occurred while compacting '{segment_path}': {e}")
+        return removed
+
+    def start_compaction(self, interval_seconds=3600):
+        # Run compact() in a background thread every `interval_seconds` until close()
+        def compaction_loop():
+            while not self.stop_event.wait(interval_seconds):
+                # Keep the thread alive whatever goes wrong in one round
+                try:
+                    self.compact()
+                except Exception as e:
+                    print(f"Feed compaction failed: {e}")
+
+        self.stop_event.clear()
+        self.compaction_thread = threading.Thread(target=compaction_loop, name='feed-compaction', daemon=True)
+        self.compaction_thread.start()
+        return self.compaction_thread
+
+    def close(self):
+        self.stop_event.set()
+        if self.compaction_thread is not None:
+            self.compaction_thread.join()
+            self.compaction_thread = None
+        with self.lock:
+            if self.writer is not None:
+                self.writer.close()
+                self.writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
 
 class FileProcessor:
     # Class to process records from a text file
     DEFAULT_FOLDER = r'C:\SwissRE\DynamicSeries\Pandas_Select\InputFiles'
 
-    def __init__(self, file_path=None):
+    def __init__(self, file_path=None, chunk_size=1000):
         self.file_path = file_path or self.DEFAULT_FOLDER
+        # Number of good records saved to the feed at a time
+        self.chunk_size = chunk_size
+        # Malformed lines are written here together with their line number and the error
+        self.quarantine_path = self.file_path + '.quarantine'
+        # Number of lines already committed and the quarantine size at that point,
+        # so a retry continues where the last run stopped without quarantining lines twice
+        self.progress_path = self.file_path + '.progress'
+        self.quarantined_lines = 0
+
+    @staticmethod
+    def parse_line(line):
+        # Split the line into components based on the predefined format
+        record_data = line.strip().split(';')
+        record_type = record_data[0].lower()
+        if len(record_data) < 3:
+            raise ValueError(f"Expected 3 fields separated by ';', got {len(record_data)}")
+
+        # Create records based on their type
+        if record_type == 'news':
+            return News(record_data[1], record_data[2])
+        elif record_type == 'privatead':
+            expiration_date = datetime.datetime.strptime(record_data[2], '%Y-%m-%d')
+            return PrivateAd(record_data[1], expiration_date)
+        elif record_type == 'quote':
+            return MotivationalQuote(record_data[1], record_data[2])
+        raise ValueError(f"Unknown record type '{record_type}'")
+
+    def iter_records(self, file, quarantine, start_line=0):
+        # Lazily yield (line_number, record) for every line after start_line of a file opened in binary mode.
+        # Lines are decoded one by one, so a line that is not valid UTF-8 is quarantined like any other bad line.
+        # Blank and bad lines are yielded with None; bad lines are also written to the quarantine file.
+        for line_number, raw_line in enumerate(file, start=1):
+            if line_number <= start_line:
+                continue
+            if not raw_line.strip():
+                yield line_number, None
+                continue
+            try:
+                yield line_number, self.parse_line(raw_line.decode('utf-8'))
+            except (ValueError, IndexError) as e:
+                line = raw_line.decode('utf-8', errors='backslashreplace')
+                quarantine.write(f"{line_number}\t{e}\t{line.rstrip()}\n")
+                self.quarantined_lines += 1
+                yield line_number, None
+
+    def read_progress(self):
+        # Return (committed line number, committed quarantine size); the size is None if it is not known
+        if not os.path.exists(self.progress_path):
+            return 0, None
+        with open(self.progress_path, 'r', encoding='utf-8') as progress:
+            fields = progress.read().split()
+        if not fields:
+            return 0, None
+        return int(fields[0]), int(fields[1]) if len(fields) > 1 else None
+
+    def commit(self, feed, quarantine, line_number):
+        # Save the pending records and remember how far the file and the quarantine have been written
+        feed.save_to_file()
+        if feed.writer is not None:
+            feed.writer.flush()
+        quarantine.flush()
+        with open(self.progress_path, 'w', encoding='utf-8') as progress:
+            progress.write(f"{line_number}\t{os.path.getsize(self.quarantine_path)}")
 
     def process_file(self, feed):
         # Check if the file exists
@@ -79,34 +1035,191 @@ class FileProcessor:
             print(f"File '{self.file_path}' not found.")
             return
 
+        start_line, quarantine_size = self.read_progress()
+        if start_line:
+            print(f"Resuming '{self.file_path}' after line {start_line}.")
+        # Drop quarantine entries written after the last commit, those lines are read again
+        if (quarantine_size is not None and os.path.exists(self.quarantine_path)
+                and os.path.getsize(self.quarantine_path) > quarantine_size):
+            os.truncate(self.quarantine_path, quarantine_size)
+
+        good_records = 0
+        self.quarantined_lines = 0
         try:
-            # Read records from the file
-            with open(self.file_path, 'r', encoding='utf-8') as file:
-                for line in file:
-                    # Split the line into components based on the predefined format
-                    record_data = line.strip().split(';')
-                    record_type = record_data[0].lower()
-
-                    # Create records based on their type
-                    if record_type == 'news':
-                        feed.add_record(News(record_data[1], record_data[2]))
-                    elif record_type == 'privatead':
-                        expiration_date = datetime.datetime.strptime(record_data[2], '%Y-%m-%d')
-                        feed.add_record(PrivateAd(record_data[1], expiration_date))
-                    elif record_type == 'quote':
-                        feed.add_record(MotivationalQuote(record_data[1], record_data[2]))
-                    else:
-                        print(f"Unknown record type '{record_type}'. Skipping line.")
-
-            # Save records to the file
-            feed.save_to_file()
-            print("File processed successfully!")
-
-            # Remove the file after successful processing
-            os.remove(self.file_path)
-            print(f"File '{self.file_path}' removed.")
+            with open(self.file_path, 'rb') as file, \
+                    open(self.quarantine_path, 'a', encoding='utf-8') as quarantine:
+                line_number = start_line
+                pending = 0
+                for line_number, record in self.iter_records(file, quarantine, start_line):
+                    if record is None:
+                        continue
+                    feed.add_record(record)
+                    good_records += 1
+                    pending += 1
+                    if pending >= self.chunk_size:
+                        self.commit(feed, quarantine, line_number)
+                        pending = 0
+
+                # Save the last chunk
+                self.commit(feed, quarantine, line_number)
         except Exception as e:
             print(f"An error occurred while processing the file: {e}")
+            if os.path.exists(self.quarantine_path) and not os.path.getsize(self.quarantine_path):
+                os.remove(self.quarantine_path)
+            return
+
+        print(f"File processed successfully! {good_records} record(s) added.")
+        if self.quarantined_lines:
+            print(f"{self.quarantined_lines} malformed line(s) were written to '{self.quarantine_path}'.")
+        elif os.path.getsize(self.quarantine_path):
+            print(f"Malformed lines from earlier runs are in '{self.quarantine_path}'.")
+        else:
+            os.remove(self.quarantine_path)
+
+        # Remove the file after successful processing
+        os.remove(self.file_path)
+        os.remove(self.progress_path)
+        print(f"File '{self.file_path}' removed.")
+
+
+def record_from_dict(data):
+    # Build a record from a JSON submission, using the same type names as the text file format
+    record_type = str(data.get('type', '')).lower()
+    if record_type == 'news':
+        return News(data['text'], data['city'])
+    elif record_type == 'privatead':
+        return PrivateAd(data['text'], datetime.datetime.strptime(data['expiration_date'], '%Y-%m-%d'))
+    elif record_type == 'quote':
+        return MotivationalQuote(data['text'], data['author'])
+    raise ValueError(f"Unknown record type '{record_type}'")
+
+
+class IngestionService:
+    # Asyncio front end that accepts line-delimited JSON records from many producers.
+    # Connections put records on a bounded queue (producers wait when it is full) and a single
+    # writer task drains the queue into the feed file in batches. Every record is acknowledged
+    # with "ok" once its batch has been written, or with "error: ..." if it was rejected.
+    def __init__(self, file_path=None, queue_size=10000, batch_size=500, durability='none'):
+        self.file_path = file_path or NewsFeed.FILE_PATH
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.durability = durability
+        self.queue = None
+        self.server = None
+        self.writer_task = None
+
+    async def start(self, host='127.0.0.1', port=8765, unix_path=None):
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.writer_task = asyncio.create_task(self.write_batches())
+        if unix_path:
+            self.server = await asyncio.start_unix_server(self.handle_connection, path=unix_path)
+        else:
+            self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server
+
+    async def stop(self):
+        # Stop accepting connections, then let the writer drain what is already queued
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        await self.queue.join()
+        self.writer_task.cancel()
+        try:
+            await self.writer_task
+        except asyncio.CancelledError:
+            pass
+
+    async def handle_connection(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    record = record_from_dict(json.loads(line))
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    writer.write(f"error: {e}\n".encode('utf-8'))
+                    await writer.drain()
+                    continue
+
+                done = loop.create_future()
+                await self.queue.put((record, done))
+                try:
+                    await done
+                    writer.write(b"ok\n")
+                except OSError as e:
+                    writer.write(f"error: {e}\n".encode('utf-8'))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def write_batches(self):
+        with FeedWriter(self.file_path, flush_records=0, durability=self.durability) as feed_writer:
+            while True:
+                batch = [await self.queue.get()]
+                while len(batch) < self.batch_size and not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+
+                # Group commit: one buffered write (and optional fsync) per batch
+                try:
+                    feed_writer.write_many(record for record, _ in batch)
+                    await asyncio.to_thread(feed_writer.flush)
+                    error = None
+                except OSError as e:
+                    error = e
+
+                for _, done in batch:
+                    if not done.done():
+                        if error is None:
+                            done.set_result(True)
+                        else:
+                            done.set_exception(error)
+                    self.queue.task_done()
+
+
+async def run_load_test(host='127.0.0.1', port=8765, producers=50, records_per_producer=200):
+    # Load generator: concurrent producers send records and wait for each acknowledgement.
+    # Reports records/sec and p50/p99 ingest latency in milliseconds.
+    latencies = []
+
+    async def produce(producer_id):
+        reader, writer = await asyncio.open_connection(host, port)
+        for i in range(records_per_producer):
+            payload = {'type': 'news', 'text': f"Load test record {i} from producer {producer_id}", 'city': 'Kyiv'}
+            start_time = time.perf_counter()
+            writer.write((json.dumps(payload) + '\n').encode('utf-8'))
+            await writer.drain()
+            await reader.readline()
+            latencies.append((time.perf_counter() - start_time) * 1000)
+        writer.close()
+        await writer.wait_closed()
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*(produce(i) for i in range(producers)))
+    elapsed = time.perf_counter() - start_time
+
+    latencies.sort()
+    results = {
+        'records_per_sec': len(latencies) / elapsed,
+        'p50_ms': latencies[len(latencies) // 2],
+        'p99_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+    print(f"{len(latencies)} records in {elapsed:.2f}s: {results['records_per_sec']:.0f} records/sec, "
+          f"p50 {results['p50_ms']:.2f} ms, p99 {results['p99_ms']:.2f} ms")
+    return results
+
+
+async def run_ingestion_benchmark(file_path, producers=50, records_per_producer=200, port=8765):
+    # Start a service on a local port, run the load generator against it and shut it down
+    service = IngestionService(file_path)
+    await service.start(port=port)
+    try:
+        return await run_load_test(port=port, producers=producers, records_per_producer=records_per_producer)
+    finally:
+        await service.stop()
 
 
 def get_valid_date(prompt):
@@ -120,61 +1233,68 @@ def get_valid_date(prompt):
 
 
 def main():
-    feed = NewsFeed()
+    # Keep the feed file open for the whole session; every saved record is flushed right away
+    writer = FeedWriter(NewsFeed.FILE_PATH, flush_records=1)
+    index = FeedIndex(NewsFeed.FILE_PATH)
+    feed = NewsFeed(writer, index=index)
 
-    while True:
-        print("\nSelect type of operation:")
-        print("1. Add record manually")
-        print("2. Process records from text file")
-        print("3. Exit")
-        choice = input("Enter your choice: ")
-
-        if choice == '1':
-            # If the user wants to add records manually
-            print("\nSelect type of record to add:")
-            print("1. News")
-            print("2. Private Ad")
-            print("3. Motivational Quote")
-            subtype = input("Enter your choice: ")
-
-            if subtype == '1':
-                # Add a News record
-                text = input("Enter the news text: ")
-                city = input("Enter the city: ")
-                feed.add_record(News(text, city))
-
-            elif subtype == '2':
-                # Add a Private Ad record
-                text = input("Enter the private ad text: ")
-                expiration_date = get_valid_date("Enter the expiration date (YYYY-MM-DD): ")
-                feed.add_record(PrivateAd(text, expiration_date))
-
-            elif subtype == '3':
-                # Add a Motivational Quote record
-                text = input("Enter the motivational quote text: ")
-                author = input("Enter the author of the quote: ")
-                feed.add_record(MotivationalQuote(text, author))
+    try:
+        while True:
+            print("\nSelect type of operation:")
+            print("1. Add record manually")
+            print("2. Process records from text file")
+            print("3. Exit")
+            choice = input("Enter your choice: ")
 
-            else:
-                print("Invalid input. Please try again.")
+            if choice == '1':
+                # If the user wants to add records manually
+                print("\nSelect type of record to add:")
+                print("1. News")
+                print("2. Private Ad")
+                print("3. Motivational Quote")
+                subtype = input("Enter your choice: ")
 
-            # Save the manually added record to the file
-            feed.save_to_file()
-            print("Record saved successfully!")
+                if subtype == '1':
+                    # Add a News record
+                    text = input("Enter the news text: ")
+                    city = input("Enter the city: ")
+                    feed.add_record(News(text, city))
 
-        elif choice == '2':
-            # If the user wants to process records from a file
-            file_path = input("Enter file path or press Enter for default folder: ")
-            processor = FileProcessor(file_path if file_path else None)
-            processor.process_file(feed)
+                elif subtype == '2':
+                    # Add a Private Ad record
+                    text = input("Enter the private ad text: ")
+                    expiration_date = get_valid_date("Enter the expiration date (YYYY-MM-DD): ")
+                    feed.add_record(PrivateAd(text, expiration_date))
 
-        elif choice == '3':
-            # Exit the program
-            print("Exiting program.")
-            break
+                elif subtype == '3':
+                    # Add a Motivational Quote record
+                    text = input("Enter the motivational quote text: ")
+                    author = input("Enter the author of the quote: ")
+                    feed.add_record(MotivationalQuote(text, author))
 
-        else:
-            print("Invalid input. Please try again.")
+                else:
+                    print("Invalid input. Please try again.")
+
+                # Save the manually added record to the file
+                feed.save_to_file()
+                print("Record saved successfully!")
+
+            elif choice == '2':
+                # If the user wants to process records from a file
+                file_path = input("Enter file path or press Enter for default folder: ")
+                processor = FileProcessor(file_path if file_path else None)
+                processor.process_file(feed)
+
+            elif choice == '3':
+                # Exit the program
+                print("Exiting program.")
+                break
+
+            else:
+                print("Invalid input. Please try again.")
+    finally:
+        writer.close()
+        index.close()
 
 
 if __name__ == '__main__':
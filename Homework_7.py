@@ -1,12 +1,16 @@
 import csv
 import os
 import string
+from collections import Counter
 
 # Paths to input and output files
 input_file_path = r'C:\SwissRE\DynamicSeries\Pandas_Select\Homework_5.txt'
 word_count_csv_path = r'C:\SwissRE\DynamicSeries\Pandas_Select\word-count.csv'
 letter_count_csv_path = r'C:\SwissRE\DynamicSeries\Pandas_Select\letter-count.csv'
 
+# Number of characters read per chunk when analyzing the input file
+CHUNK_SIZE = 1024 * 1024
+
 
 def preprocess_text(text):
     """Convert text to lowercase and remove punctuation."""
@@ -27,6 +31,7 @@ def calculate_word_count(file_path):
 def calculate_letter_statistics(file_path):
     """Calculate letter statistics for the file."""
     letter_stats = {}
+    uppercase_stats = {}
     total_letters = 0
     total_uppercase_letters = 0
 
@@ -35,21 +40,80 @@ def calculate_letter_statistics(file_path):
             for char in line:
                 if char.isalpha():  # Check if the character is alphabetic
                     total_letters += 1
-                    if char.isupper():
-                        total_uppercase_letters += 1
-
                     char_lower = char.lower()
                     letter_stats[char_lower] = letter_stats.get(char_lower, 0) + 1
 
+                    if char.isupper():
+                        total_uppercase_letters += 1
+                        uppercase_stats[char_lower] = uppercase_stats.get(char_lower, 0) + 1
+
     # Calculate the percentage of uppercase letters
     return {
         'letter_stats': letter_stats,
+        'uppercase_stats': uppercase_stats,
         'total_letters': total_letters,
         'total_uppercase_letters': total_uppercase_letters,
         'uppercase_percentage': (total_uppercase_letters / total_letters * 100) if total_letters else 0
     }
 
 
+def build_letter_statistics(char_counts):
+    """
+    Fold a character histogram into the letter statistics structure.
+    :param char_counts: Mapping of character -> number of occurrences.
+    """
+    letter_stats = {}
+    uppercase_stats = {}
+    total_letters = 0
+    total_uppercase_letters = 0
+
+    # Only the distinct characters are inspected, not every occurrence
+    for char, count in char_counts.items():
+        if char.isalpha():
+            total_letters += count
+            char_lower = char.lower()
+            letter_stats[char_lower] = letter_stats.get(char_lower, 0) + count
+
+            if char.isupper():
+                total_uppercase_letters += count
+                uppercase_stats[char_lower] = uppercase_stats.get(char_lower, 0) + count
+
+    return {
+        'letter_stats': letter_stats,
+        'uppercase_stats': uppercase_stats,
+        'total_letters': total_letters,
+        'total_uppercase_letters': total_uppercase_letters,
+        'uppercase_percentage': (total_uppercase_letters / total_letters * 100) if total_letters else 0
+    }
+
+
+def analyze_file(file_path, chunk_size=CHUNK_SIZE):
+    """
+    Calculate word count and letter statistics in a single pass over the file.
+    :param file_path: Path to the text file.
+    :param chunk_size: Approximate number of characters read per chunk.
+    :return: Tuple of (word_count, letter_statistics) in the same format as
+             calculate_word_count and calculate_letter_statistics.
+    """
+    word_count = Counter()
+    char_counts = Counter()
+    punctuation_table = str.maketrans("", "", string.punctuation)
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            # Extend the chunk to the end of the line so no word is split in two
+            if not chunk.endswith('\n'):
+                chunk += f.readline()
+
+            char_counts.update(chunk)
+            word_count.update(chunk.lower().translate(punctuation_table).split())
+
+    return dict(word_count), build_letter_statistics(char_counts)
+
+
 def write_word_count_to_csv(word_count, csv_path):
     """Write word count to a CSV file."""
     with open(csv_path, 'w', encoding='utf-8', newline='') as csvfile:
@@ -65,7 +129,7 @@ def write_letter_statistics_to_csv(stats, csv_path):
         writer = csv.writer(csvfile)
         writer.writerow(['Letter', 'Count_All', 'Count_Uppercase', 'Percentage_Uppercase'])
         for letter, count in sorted(stats['letter_stats'].items()):
-            count_uppercase = stats['letter_stats'].get(letter.upper(), 0)
+            count_uppercase = stats.get('uppercase_stats', {}).get(letter, 0)
             percentage_uppercase = (count_uppercase / count * 100) if count else 0
             writer.writerow([letter, count, count_uppercase, percentage_uppercase])
 
@@ -83,10 +147,9 @@ def recreate_csv_files(input_file, word_count_csv, letter_count_csv):
 
     print(f"Processing file: {input_file}")
 
-    word_count = calculate_word_count(input_file)
+    word_count, letter_statistics = analyze_file(input_file)
     write_word_count_to_csv(word_count, word_count_csv)
 
-    letter_statistics = calculate_letter_statistics(input_file)
     write_letter_statistics_to_csv(letter_statistics, letter_count_csv)
 
     print(f"Files created:\n - {word_count_csv}\n - {letter_count_csv}")
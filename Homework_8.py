@@ -1,7 +1,16 @@
 import csv
+import hashlib
 import os
 import json
+import re
+import sqlite3
 import string
+import time
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
 
 
 # Paths for default input and output files (adjustable)
@@ -9,21 +18,270 @@ DEFAULT_FOLDER = r'C:\SwissRE\DynamicSeries\Pandas_Select'
 json_input_file = os.path.join(DEFAULT_FOLDER, 'input.json')
 word_count_csv_path = os.path.join(DEFAULT_FOLDER, 'word-count.csv')
 letter_count_csv_path = os.path.join(DEFAULT_FOLDER, 'letter-count.csv')
+stats_cache_path = os.path.join(DEFAULT_FOLDER, 'stats-cache.db')
+
+# Number of characters read per chunk when analyzing the input file
+CHUNK_SIZE = 1024 * 1024
+
+# Number of characters read at a time when streaming a JSON array
+JSON_CHUNK_SIZE = 64 * 1024
+JSON_SEPARATORS = re.compile(r'[\s,]*')
+# Characters that may follow an array element; a value is only complete once one of them was read
+JSON_ELEMENT_ENDS = frozenset(' \t\r\n,]')
+
+
+class StatsCache:
+    """An on-disk cache of word and letter statistics keyed on the content hash of the input file."""
+
+    def __init__(self, db_path=None, max_bytes=256 * 1024 * 1024):
+        """
+        Initialize the cache and set up its tables.
+        :param db_path: Path to the SQLite cache file (optional). If not provided, it is stored next to the outputs.
+        :param max_bytes: Size budget for cached results; least recently used entries are evicted above it.
+        """
+        self.db_path = db_path or stats_cache_path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.connection = sqlite3.connect(self.db_path)
+        with self.connection:
+            # Digest of each known input file, reused while its size and mtime are unchanged
+            self.connection.execute('''
+                CREATE TABLE IF NOT EXISTS file_digest (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    digest TEXT NOT NULL
+                )
+            ''')
+            self.connection.execute('''
+                CREATE TABLE IF NOT EXISTS stats_cache (
+                    digest TEXT PRIMARY KEY,
+                    word_count TEXT NOT NULL,
+                    letter_statistics TEXT NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            ''')
+
+    def digest(self, input_file):
+        """
+        Return the content hash of the input file.
+        The file is only hashed again when its size or modification time has changed.
+        """
+        path = os.path.abspath(input_file)
+        stat = os.stat(path)
+        row = self.connection.execute(
+            'SELECT digest FROM file_digest WHERE path = ? AND size = ? AND mtime_ns = ?',
+            (path, stat.st_size, stat.st_mtime_ns)
+        ).fetchone()
+        if row:
+            return row[0]
+
+        file_hash = hashlib.blake2b(digest_size=20)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(CHUNK_SIZE), b''):
+                file_hash.update(block)
+        digest = file_hash.hexdigest()
+
+        with self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO file_digest (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)',
+                (path, stat.st_size, stat.st_mtime_ns, digest)
+            )
+        return digest
+
+    def get(self, input_file):
+        """
+        Look up the cached results of the input file.
+        :return: Tuple of (word_count, letter_statistics), or None on a cache miss.
+        """
+        digest = self.digest(input_file)
+        row = self.connection.execute(
+            'SELECT word_count, letter_statistics FROM stats_cache WHERE digest = ?', (digest,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        with self.connection:
+            self.connection.execute('UPDATE stats_cache SET last_used = ? WHERE digest = ?', (time.time(), digest))
+        return json.loads(row[0]), json.loads(row[1])
+
+    def put(self, input_file, word_count, letter_statistics):
+        """Store the results of the input file and evict least recently used entries above the size budget."""
+        word_count_json = json.dumps(word_count, ensure_ascii=False)
+        letter_statistics_json = json.dumps(letter_statistics, ensure_ascii=False)
+        size_bytes = len(word_count_json) + len(letter_statistics_json)
+
+        with self.connection:
+            self.connection.execute(
+                '''
+                INSERT OR REPLACE INTO stats_cache (digest, word_count, letter_statistics, size_bytes, last_used)
+                VALUES (?, ?, ?, ?, ?)
+                ''',
+                (self.digest(input_file), word_count_json, letter_statistics_json, size_bytes, time.time())
+            )
+            total_bytes = self.connection.execute('SELECT COALESCE(SUM(size_bytes), 0) FROM stats_cache').fetchone()[0]
+            for digest, entry_bytes in self.connection.execute(
+                'SELECT digest, size_bytes FROM stats_cache ORDER BY last_used'
+            ).fetchall():
+                if total_bytes <= self.max_bytes:
+                    break
+                self.connection.execute('DELETE FROM stats_cache WHERE digest = ?', (digest,))
+                total_bytes -= entry_bytes
+
+    def close(self):
+        """Print the hit/miss counters and close the cache database."""
+        print(f"Statistics cache: {self.hits} hit(s), {self.misses} miss(es).")
+        self.connection.close()
 
 
 class JSONFileProcessor:
     """A class to handle JSON files for input records."""
 
-    def __init__(self, file_path=None):
+    def __init__(self, file_path=None, workers=1, batch_size=1000, cache=None):
         """
         Initialize file processor.
         :param file_path: The path to the JSON file (optional). If not provided, the default path will be used.
+        :param workers: Number of worker processes. With more than one worker, records are processed
+                        in batches by recreate_csv_files_parallel.
+        :param batch_size: Number of records per batch in parallel mode.
+        :param cache: Optional StatsCache used to skip the analysis of input files that were seen before.
         """
         self.file_path = file_path or json_input_file
+        self.workers = workers
+        self.batch_size = batch_size
+        self.cache = cache
+        # Resume point of an interrupted run, so processed records are not processed again
+        self.progress_path = self.file_path + '.progress'
+
+    def detect_format(self):
+        """
+        Detect the layout of the input file.
+        :return: 'ndjson' for one record per line, 'array' for a top-level list, 'object' for a single record.
+        """
+        if os.path.splitext(self.file_path)[1].lower() in ('.ndjson', '.jsonl'):
+            return 'ndjson'
+
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            first_line = ''
+            while not first_line.strip():
+                first_line = f.readline()
+                if not first_line:
+                    return 'object'
+            if first_line.lstrip().startswith('['):
+                return 'array'
+            second_line = f.readline()
+
+        # A complete object on the first line followed by more content means one record per line
+        try:
+            json.loads(first_line)
+        except ValueError:
+            return 'object'
+        return 'ndjson' if second_line.strip() else 'object'
+
+    def iter_ndjson(self, offset=0):
+        """
+        Yield (record, resume_point) for every line of an NDJSON file, starting at a byte offset.
+        Lines that are not valid JSON are reported and skipped.
+        """
+        with open(self.file_path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    print(f"Error: Invalid JSON at byte {offset - len(line)}: {e}. Skipping this line.")
+                    continue
+                yield record, {'offset': offset}
+
+    def iter_array(self, skip=0):
+        """
+        Yield (record, resume_point) for every element of a top-level JSON array, decoding one element
+        at a time from a buffer that is refilled in chunks.
+        """
+        decoder = json.JSONDecoder()
+        index = 0
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            buffer = ''
+            position = 0
+            started = False
+            eof = False
+            while True:
+                # Skip whitespace, the opening bracket and the separators between elements
+                position = JSON_SEPARATORS.match(buffer, position).end()
+                if not started and position < len(buffer):
+                    if buffer[position] != '[':
+                        raise ValueError("Expected a JSON array.")
+                    started = True
+                    position = JSON_SEPARATORS.match(buffer, position + 1).end()
+                if position < len(buffer) and buffer[position] == ']':
+                    return
+
+                if position < len(buffer):
+                    try:
+                        record, end = decoder.raw_decode(buffer, position)
+                    except ValueError:
+                        if eof:
+                            raise
+                        record = end = None
+                    # A number cut at the chunk boundary ("1." of "1.5e10") decodes too,
+                    # so the element must be followed by a separator unless the file has ended
+                    if end is not None and (eof or (end < len(buffer) and buffer[end] in JSON_ELEMENT_ENDS)):
+                        position = end
+                        index += 1
+                        if index > skip:
+                            yield record, {'records': index}
+                        continue
+                elif eof:
+                    raise ValueError("Unexpected end of JSON array.")
+
+                # Need more data: keep the unparsed tail and read the next chunk
+                chunk = f.read(JSON_CHUNK_SIZE)
+                eof = not chunk
+                buffer = buffer[position:] + chunk
+                position = 0
+
+    def iter_records(self, resume_point=None):
+        """
+        Yield (record, resume_point) pairs lazily, whatever the layout of the input file is.
+        :param resume_point: Resume point returned for the last record handled by an earlier run.
+        """
+        resume_point = resume_point or {}
+        file_format = self.detect_format()
+        if file_format == 'ndjson':
+            yield from self.iter_ndjson(resume_point.get('offset', 0))
+        elif file_format == 'array':
+            yield from self.iter_array(resume_point.get('records', 0))
+        elif not resume_point:
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if not isinstance(data, dict):
+                raise ValueError("Invalid JSON format. Provide a dictionary or list of dictionaries.")
+            yield data, {'records': 1}
+
+    def load_progress(self):
+        """Load the resume point of an interrupted run, if there is one."""
+        if not os.path.exists(self.progress_path):
+            return None
+        with open(self.progress_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def save_progress(self, resume_point):
+        """Save the resume point after a record has been processed."""
+        with open(self.progress_path, 'w', encoding='utf-8') as f:
+            json.dump(resume_point, f)
 
     def process_file(self):
         """
         Read input from the JSON file, process the records, and optionally remove the file if successful.
+        Records are processed as soon as they are decoded. If the run is interrupted, the next run
+        continues after the last processed record.
         """
         # Ensure folder exists
         folder_path = os.path.dirname(self.file_path)
@@ -37,39 +295,50 @@ class JSONFileProcessor:
 
         try:
             print(f"Reading input JSON file: {self.file_path}")
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            # Process one or many records depending on the structure of the JSON
-            if isinstance(data, dict):
-                # Single record provided
-                records = [data]
-            elif isinstance(data, list):
-                # Multiple records provided
-                records = data
-            else:
-                print("Error: Invalid JSON format. Provide a dictionary or list of dictionaries.")
-                return
-
-            for record in records:
-                self.process_record(record)
+            resume_point = self.load_progress()
+            if resume_point:
+                print(f"Resuming after {resume_point}.")
+
+            jobs = []
+            for record, resume_point in self.iter_records(resume_point):
+                if not isinstance(record, dict):
+                    print("Error: Record is not a JSON object. Skipping this record.")
+                elif self.workers > 1:
+                    job = self.resolve_record(record)
+                    if job:
+                        jobs.append(job)
+                    if len(jobs) >= self.batch_size:
+                        recreate_csv_files_parallel(jobs, self.workers, self.cache)
+                        jobs = []
+                else:
+                    self.process_record(record)
+                # While jobs are pending, the progress stays at the last completed batch
+                if not jobs:
+                    self.save_progress(resume_point)
+
+            if jobs:
+                recreate_csv_files_parallel(jobs, self.workers, self.cache)
+                self.save_progress(resume_point)
 
             # Remove file after successful processing
             print(f"Removing successfully processed JSON file: {self.file_path}")
             os.remove(self.file_path)
+            if os.path.exists(self.progress_path):
+                os.remove(self.progress_path)
 
         except Exception as e:
             print(f"An error occurred while processing the JSON file: {e}")
 
-    def process_record(self, record):
+    def resolve_record(self, record):
         """
-        Process a single record.
+        Resolve the input and output paths of a single record.
         :param record: A single input record from the JSON file.
+        :return: Tuple of (input_file, word_count_csv, letter_count_csv), or None if the record is invalid.
         """
         input_file = record.get('input_file', '')
         if not input_file:
             print("Error: Record is missing 'input_file' key. Skipping this record.")
-            return
+            return None
 
         # Use default folder if the file path is not absolute
         input_file_path = input_file if os.path.isabs(input_file) else os.path.join(DEFAULT_FOLDER, input_file)
@@ -78,7 +347,71 @@ class JSONFileProcessor:
         word_count_csv = record.get('word_count_csv', word_count_csv_path)
         letter_count_csv = record.get('letter_count_csv', letter_count_csv_path)
 
-        recreate_csv_files(input_file_path, word_count_csv, letter_count_csv)
+        return input_file_path, word_count_csv, letter_count_csv
+
+    def process_record(self, record):
+        """
+        Process a single record.
+        :param record: A single input record from the JSON file.
+        """
+        job = self.resolve_record(record)
+        if job:
+            recreate_csv_files(*job, cache=self.cache)
+
+
+def benchmark_json_loading(file_path, record_count=200_000):
+    """
+    Compare json.load with the streaming array parser and NDJSON on generated manifests.
+    Measures total time, time to the first record and peak Python memory (tracemalloc).
+    Only decoding is measured, not the CSV generation.
+    :param file_path: Base path for the generated manifests (they will be removed).
+    :param record_count: Number of records in each manifest.
+    :return: Dictionary with the measurements of each loader.
+    """
+    array_path = file_path + '.json'
+    ndjson_path = file_path + '.ndjson'
+    records = ({'input_file': f"input_{i}.txt", 'word_count_csv': f"word-count-{i}.csv"} for i in range(record_count))
+    with open(array_path, 'w', encoding='utf-8') as array_file, open(ndjson_path, 'w', encoding='utf-8') as ndjson_file:
+        array_file.write('[\n')
+        for i, record in enumerate(records):
+            line = json.dumps(record)
+            array_file.write(('  ' if i == 0 else ', ') + line + '\n')
+            ndjson_file.write(line + '\n')
+        array_file.write(']\n')
+
+    def load_whole():
+        with open(array_path, 'r', encoding='utf-8') as f:
+            yield from json.load(f)
+
+    def load_array():
+        for record, _ in JSONFileProcessor(array_path).iter_records():
+            yield record
+
+    def load_ndjson():
+        for record, _ in JSONFileProcessor(ndjson_path).iter_records():
+            yield record
+
+    results = {}
+    for label, loader in (('json.load', load_whole), ('array stream', load_array), ('ndjson', load_ndjson)):
+        tracemalloc.start()
+        start_time = time.perf_counter()
+        first_record_time = None
+        count = 0
+        for _ in loader():
+            if first_record_time is None:
+                first_record_time = time.perf_counter() - start_time
+            count += 1
+        elapsed = time.perf_counter() - start_time
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        results[label] = {'seconds': elapsed, 'first_record_seconds': first_record_time, 'peak_bytes': peak_memory}
+        print(f"{label}: {count} records in {elapsed:.2f}s, first record after {first_record_time * 1000:.2f} ms, "
+              f"peak memory {peak_memory / 1024 / 1024:.1f} MiB")
+
+    os.remove(array_path)
+    os.remove(ndjson_path)
+    return results
 
 
 def preprocess_text(text):
@@ -100,6 +433,7 @@ def calculate_word_count(file_path):
 def calculate_letter_statistics(file_path):
     """Calculate letter statistics for the file."""
     letter_stats = {}
+    uppercase_stats = {}
     total_letters = 0
     total_uppercase_letters = 0
 
@@ -108,24 +442,109 @@ def calculate_letter_statistics(file_path):
             for char in line:
                 if char.isalpha():  # Check if the character is alphabetic
                     total_letters += 1
-                    if char.isupper():
-                        total_uppercase_letters += 1
-
                     char_lower = char.lower()
                     letter_stats[char_lower] = letter_stats.get(char_lower, 0) + 1
 
+                    if char.isupper():
+                        total_uppercase_letters += 1
+                        uppercase_stats[char_lower] = uppercase_stats.get(char_lower, 0) + 1
+
     # Calculate the percentage of uppercase letters
     return {
         'letter_stats': letter_stats,
+        'uppercase_stats': uppercase_stats,
+        'total_letters': total_letters,
+        'total_uppercase_letters': total_uppercase_letters,
+        'uppercase_percentage': (total_uppercase_letters / total_letters * 100) if total_letters else 0
+    }
+
+
+def build_letter_statistics(char_counts):
+    """
+    Fold a character histogram into the letter statistics structure.
+    :param char_counts: Mapping of character -> number of occurrences.
+    """
+    letter_stats = {}
+    uppercase_stats = {}
+    total_letters = 0
+    total_uppercase_letters = 0
+
+    # Only the distinct characters are inspected, not every occurrence
+    for char, count in char_counts.items():
+        if char.isalpha():
+            total_letters += count
+            char_lower = char.lower()
+            letter_stats[char_lower] = letter_stats.get(char_lower, 0) + count
+
+            if char.isupper():
+                total_uppercase_letters += count
+                uppercase_stats[char_lower] = uppercase_stats.get(char_lower, 0) + count
+
+    return {
+        'letter_stats': letter_stats,
+        'uppercase_stats': uppercase_stats,
         'total_letters': total_letters,
         'total_uppercase_letters': total_uppercase_letters,
         'uppercase_percentage': (total_uppercase_letters / total_letters * 100) if total_letters else 0
     }
 
 
+def analyze_file(file_path, chunk_size=CHUNK_SIZE):
+    """
+    Calculate word count and letter statistics in a single pass over the file.
+    :param file_path: Path to the text file.
+    :param chunk_size: Approximate number of characters read per chunk.
+    :return: Tuple of (word_count, letter_statistics) in the same format as
+             calculate_word_count and calculate_letter_statistics.
+    """
+    word_count = Counter()
+    char_counts = Counter()
+    punctuation_table = str.maketrans("", "", string.punctuation)
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            # Extend the chunk to the end of the line so no word is split in two
+            if not chunk.endswith('\n'):
+                chunk += f.readline()
+
+            char_counts.update(chunk)
+            word_count.update(chunk.lower().translate(punctuation_table).split())
+
+    return dict(word_count), build_letter_statistics(char_counts)
+
+
+# One lock per output file, so manifests processed at the same time (SpoolFolder) never interleave writes
+output_locks = {}
+output_locks_guard = threading.Lock()
+
+
+@contextmanager
+def open_output(csv_path):
+    """
+    Open an output CSV file for writing, one writer at a time per path.
+    The data is written to a temporary file that replaces the output when complete, so readers
+    (and writers from other modules without this lock) never see a half-written file.
+    """
+    key = os.path.normcase(os.path.abspath(csv_path))
+    with output_locks_guard:
+        lock = output_locks.setdefault(key, threading.Lock())
+    with lock:
+        temp_path = f"{csv_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8', newline='') as csvfile:
+                yield csvfile
+            os.replace(temp_path, csv_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
 def write_word_count_to_csv(word_count, csv_path):
     """Write word count to a CSV file."""
-    with open(csv_path, 'w', encoding='utf-8', newline='') as csvfile:
+    with open_output(csv_path) as csvfile:
         writer = csv.writer(csvfile)
         writer.writerow(['Word', 'Count'])
         for word, count in sorted(word_count.items()):
@@ -134,17 +553,20 @@ def write_word_count_to_csv(word_count, csv_path):
 
 def write_letter_statistics_to_csv(stats, csv_path):
     """Write letter statistics to a CSV file."""
-    with open(csv_path, 'w', encoding='utf-8', newline='') as csvfile:
+    with open_output(csv_path) as csvfile:
         writer = csv.writer(csvfile)
         writer.writerow(['Letter', 'Count_All', 'Count_Uppercase', 'Percentage_Uppercase'])
         for letter, count in sorted(stats['letter_stats'].items()):
-            count_uppercase = stats['letter_stats'].get(letter.upper(), 0)
+            count_uppercase = stats.get('uppercase_stats', {}).get(letter, 0)
             percentage_uppercase = (count_uppercase / count * 100) if count else 0
             writer.writerow([letter, count, count_uppercase, percentage_uppercase])
 
 
-def recreate_csv_files(input_file, word_count_csv, letter_count_csv):
-    """Main function to process the input file and write results to CSV files."""
+def recreate_csv_files(input_file, word_count_csv, letter_count_csv, cache=None):
+    """
+    Main function to process the input file and write results to CSV files.
+    :param cache: Optional StatsCache; on a hit the analysis is skipped and only the CSV files are written.
+    """
     if not os.path.exists(input_file):
         print(f"Error: The input file '{input_file}' does not exist. Please check the file path.")
         return
@@ -154,19 +576,75 @@ def recreate_csv_files(input_file, word_count_csv, letter_count_csv):
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
-    print(f"Processing file: {input_file}")
+    cached = cache.get(input_file) if cache else None
+    if cached:
+        print(f"Using cached statistics for file: {input_file}")
+        word_count, letter_statistics = cached
+    else:
+        print(f"Processing file: {input_file}")
+        word_count, letter_statistics = analyze_file(input_file)
+        if cache:
+            cache.put(input_file, word_count, letter_statistics)
 
-    word_count = calculate_word_count(input_file)
     write_word_count_to_csv(word_count, word_count_csv)
-
-    letter_statistics = calculate_letter_statistics(input_file)
     write_letter_statistics_to_csv(letter_statistics, letter_count_csv)
 
     print(f"Files created:\n - {word_count_csv}\n - {letter_count_csv}")
 
 
+def recreate_csv_files_parallel(jobs, workers, cache=None):
+    """
+    Process a batch of manifest records with a pool of worker processes.
+    Every input file is analyzed once, however many records point at it, and its results are
+    written to every output requested for it. When several records write to the same output path,
+    only the last one in manifest order is written, which is the same result as processing the
+    records one after another, without two workers racing for the file.
+    :param jobs: List of (input_file, word_count_csv, letter_count_csv) tuples in manifest order.
+    :param workers: Number of worker processes.
+    :param cache: Optional StatsCache; only input files without cached results are analyzed.
+    """
+    word_outputs = {}
+    letter_outputs = {}
+    for input_file, word_count_csv, letter_count_csv in jobs:
+        if not os.path.exists(input_file):
+            print(f"Error: The input file '{input_file}' does not exist. Please check the file path.")
+            continue
+        word_outputs[word_count_csv] = input_file
+        letter_outputs[letter_count_csv] = input_file
+
+    input_files = list(dict.fromkeys(list(word_outputs.values()) + list(letter_outputs.values())))
+    results = {}
+    if cache:
+        for input_file in input_files:
+            cached = cache.get(input_file)
+            if cached:
+                results[input_file] = cached
+        input_files = [input_file for input_file in input_files if input_file not in results]
+
+    print(f"Processing {len(input_files)} input file(s) for {len(jobs)} record(s) with {workers} worker(s)")
+    if input_files:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for input_file, result in zip(input_files, executor.map(analyze_file, input_files)):
+                results[input_file] = result
+                if cache:
+                    cache.put(input_file, *result)
+
+    for csv_path, input_file in word_outputs.items():
+        if os.path.dirname(csv_path):
+            os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+        write_word_count_to_csv(results[input_file][0], csv_path)
+    for csv_path, input_file in letter_outputs.items():
+        if os.path.dirname(csv_path):
+            os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+        write_letter_statistics_to_csv(results[input_file][1], csv_path)
+
+    print("Files created:\n" + "\n".join(f" - {path}" for path in list(word_outputs) + list(letter_outputs)))
+
+
 if __name__ == "__main__":
-    # Create an instance of JSONFileProcessor and process the JSON file
-    processor = JSONFileProcessor()
+    # Create an instance of JSONFileProcessor and process the JSON file, reusing cached statistics
+    cache = StatsCache()
+    processor = JSONFileProcessor(cache=cache)
     processor.process_file()
+    cache.close()
     
\ No newline at end of file
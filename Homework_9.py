@@ -1,6 +1,15 @@
 import csv
+import hashlib
+import json
 import os
+import sqlite3
 import string
+import time
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
 import xml.etree.ElementTree as ET
 
 
@@ -9,17 +18,158 @@ DEFAULT_FOLDER = r'C:\SwissRE\DynamicSeries\Pandas_Select'
 input_file_path = os.path.join(DEFAULT_FOLDER, 'Homework_5.txt')
 word_count_csv_path = os.path.join(DEFAULT_FOLDER, 'word-count.csv')
 letter_count_csv_path = os.path.join(DEFAULT_FOLDER, 'letter-count.csv')
+stats_cache_path = os.path.join(DEFAULT_FOLDER, 'stats-cache.db')
+
+# Number of characters read per chunk when analyzing the input file
+CHUNK_SIZE = 1024 * 1024
+
+
+class StatsCache:
+    """An on-disk cache of word and letter statistics keyed on the content hash of the input file."""
+
+    def __init__(self, db_path=None, max_bytes=256 * 1024 * 1024):
+        """
+        Initialize the cache and set up its tables.
+        :param db_path: Path to the SQLite cache file (optional). If not provided, it is stored next to the outputs.
+        :param max_bytes: Size budget for cached results; least recently used entries are evicted above it.
+        """
+        self.db_path = db_path or stats_cache_path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.connection = sqlite3.connect(self.db_path)
+        with self.connection:
+            # Digest of each known input file, reused while its size and mtime are unchanged
+            self.connection.execute('''
+                CREATE TABLE IF NOT EXISTS file_digest (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    digest TEXT NOT NULL
+                )
+            ''')
+            self.connection.execute('''
+                CREATE TABLE IF NOT EXISTS stats_cache (
+                    digest TEXT PRIMARY KEY,
+                    word_count TEXT NOT NULL,
+                    letter_statistics TEXT NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            ''')
+
+    def digest(self, input_file):
+        """
+        Return the content hash of the input file.
+        The file is only hashed again when its size or modification time has changed.
+        """
+        path = os.path.abspath(input_file)
+        stat = os.stat(path)
+        row = self.connection.execute(
+            'SELECT digest FROM file_digest WHERE path = ? AND size = ? AND mtime_ns = ?',
+            (path, stat.st_size, stat.st_mtime_ns)
+        ).fetchone()
+        if row:
+            return row[0]
+
+        file_hash = hashlib.blake2b(digest_size=20)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(CHUNK_SIZE), b''):
+                file_hash.update(block)
+        digest = file_hash.hexdigest()
+
+        with self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO file_digest (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)',
+                (path, stat.st_size, stat.st_mtime_ns, digest)
+            )
+        return digest
+
+    def get(self, input_file):
+        """
+        Look up the cached results of the input file.
+        :return: Tuple of (word_count, letter_statistics), or None on a cache miss.
+        """
+        digest = self.digest(input_file)
+        row = self.connection.execute(
+            'SELECT word_count, letter_statistics FROM stats_cache WHERE digest = ?', (digest,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        with self.connection:
+            self.connection.execute('UPDATE stats_cache SET last_used = ? WHERE digest = ?', (time.time(), digest))
+        return json.loads(row[0]), json.loads(row[1])
+
+    def put(self, input_file, word_count, letter_statistics):
+        """Store the results of the input file and evict least recently used entries above the size budget."""
+        word_count_json = json.dumps(word_count, ensure_ascii=False)
+        letter_statistics_json = json.dumps(letter_statistics, ensure_ascii=False)
+        size_bytes = len(word_count_json) + len(letter_statistics_json)
+
+        with self.connection:
+            self.connection.execute(
+                '''
+                INSERT OR REPLACE INTO stats_cache (digest, word_count, letter_statistics, size_bytes, last_used)
+                VALUES (?, ?, ?, ?, ?)
+                ''',
+                (self.digest(input_file), word_count_json, letter_statistics_json, size_bytes, time.time())
+            )
+            total_bytes = self.connection.execute('SELECT COALESCE(SUM(size_bytes), 0) FROM stats_cache').fetchone()[0]
+            for digest, entry_bytes in self.connection.execute(
+                'SELECT digest, size_bytes FROM stats_cache ORDER BY last_used'
+            ).fetchall():
+                if total_bytes <= self.max_bytes:
+                    break
+                self.connection.execute('DELETE FROM stats_cache WHERE digest = ?', (digest,))
+                total_bytes -= entry_bytes
+
+    def close(self):
+        """Print the hit/miss counters and close the cache database."""
+        print(f"Statistics cache: {self.hits} hit(s), {self.misses} miss(es).")
+        self.connection.close()
 
 
 class XMLFileProcessor:
     """A class to process records provided via an XML file."""
 
-    def __init__(self, file_path=None):
+    def __init__(self, file_path=None, streaming=True, workers=1, batch_size=1000, cache=None):
         """
         Initialize XML file processor.
         :param file_path: The path to the XML file (optional). If not provided, the default folder's XML file will be used.
+        :param streaming: Process each <record> as soon as it is parsed instead of loading the whole document.
+        :param workers: Number of worker processes. With more than one worker, records are processed
+                        in batches by recreate_csv_files_parallel.
+        :param batch_size: Number of records per batch in parallel mode.
+        :param cache: Optional StatsCache used to skip the analysis of input files that were seen before.
         """
         self.file_path = file_path or os.path.join(DEFAULT_FOLDER, 'input.xml')
+        self.streaming = streaming
+        self.workers = workers
+        self.batch_size = batch_size
+        self.cache = cache
+
+    def iter_records(self):
+        """
+        Yield the top-level <record> elements one at a time using ET.iterparse.
+        Each record is cleared from the tree after it has been handled, so memory stays flat.
+        """
+        depth = 0
+        root = None
+        for event, element in ET.iterparse(self.file_path, events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                if root is None:
+                    root = element
+                continue
+
+            depth -= 1
+            if depth == 1 and element.tag == 'record':
+                yield element
+                # Drop the processed record (and anything parsed before it) from the root
+                root.clear()
 
     def process_file(self):
         """
@@ -37,17 +187,35 @@ class XMLFileProcessor:
 
         try:
             print(f"Reading input XML file: {self.file_path}")
-            tree = ET.parse(self.file_path)
-            root = tree.getroot()
+            if self.streaming:
+                records = self.iter_records()
+            else:
+                tree = ET.parse(self.file_path)
+                root = tree.getroot()
 
-            # Process one or multiple records depending on the XML format
-            records = root.findall('./record')  # Each `record` should be an XML tag
-            if not records:
-                print("Error: No records found in the XML file. Ensure the file is correctly formatted.")
-                return
+                # Process one or multiple records depending on the XML format
+                records = root.findall('./record')  # Each `record` should be an XML tag
 
+            processed = 0
+            jobs = []
             for record in records:
-                self.process_record(record)
+                processed += 1
+                if self.workers > 1:
+                    job = self.resolve_record(record)
+                    if job:
+                        jobs.append(job)
+                    if len(jobs) >= self.batch_size:
+                        recreate_csv_files_parallel(jobs, self.workers, self.cache)
+                        jobs = []
+                else:
+                    self.process_record(record)
+
+            if jobs:
+                recreate_csv_files_parallel(jobs, self.workers, self.cache)
+
+            if not processed:
+                print("Error: No records found in the XML file. Ensure the file is correctly formatted.")
+                return
 
             # Remove file after successful processing
             print(f"Removing successfully processed XML file: {self.file_path}")
@@ -56,24 +224,72 @@ class XMLFileProcessor:
         except Exception as e:
             print(f"An error occurred while processing the XML file: {e}")
 
-    def process_record(self, record):
+    def resolve_record(self, record):
         """
-        Process a single record from the XML file.
+        Resolve the input and output paths of a single record from the XML file.
         :param record: An XML element containing fields for one record.
+        :return: Tuple of (input_file, word_count_csv, letter_count_csv), or None if the record is invalid.
         """
         # Extract fields from the record
-        input_file = record.find('input_file').text
-        word_count_csv = record.find('word_count_csv').text if record.find('word_count_csv') is not None else word_count_csv_path
-        letter_count_csv = record.find('letter_count_csv').text if record.find('letter_count_csv') is not None else letter_count_csv_path
+        input_file = record.findtext('input_file')
+        word_count_csv = record.findtext('word_count_csv') or word_count_csv_path
+        letter_count_csv = record.findtext('letter_count_csv') or letter_count_csv_path
 
         if not input_file:
             print("Error: Record is missing 'input_file' element. Skipping this record.")
-            return
+            return None
 
         # Use default folder if the file path is not absolute
         input_file_path = input_file if os.path.isabs(input_file) else os.path.join(DEFAULT_FOLDER, input_file)
 
-        recreate_csv_files(input_file_path, word_count_csv, letter_count_csv)
+        return input_file_path, word_count_csv, letter_count_csv
+
+    def process_record(self, record):
+        """
+        Process a single record from the XML file.
+        :param record: An XML element containing fields for one record.
+        """
+        job = self.resolve_record(record)
+        if job:
+            recreate_csv_files(*job, cache=self.cache)
+
+
+def benchmark_xml_loading(file_path, record_count=200_000):
+    """
+    Compare the DOM loader with the streaming iterparse loader on a generated manifest.
+    Only the parsing and iteration over records is measured, not the CSV generation.
+    :param file_path: Path where the generated manifest is written (it will be removed).
+    :param record_count: Number of <record> elements in the manifest.
+    :return: Dictionary with time and peak memory for both loaders.
+    """
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write('<records>\n')
+        for i in range(record_count):
+            f.write(f'  <record><input_file>input_{i}.txt</input_file>'
+                    f'<word_count_csv>word-count-{i}.csv</word_count_csv></record>\n')
+        f.write('</records>\n')
+
+    def load_dom():
+        return sum(1 for record in ET.parse(file_path).getroot().findall('./record') if record.findtext('input_file'))
+
+    def load_streaming():
+        return sum(1 for record in XMLFileProcessor(file_path).iter_records() if record.findtext('input_file'))
+
+    results = {}
+    for label, loader in (('dom', load_dom), ('iterparse', load_streaming)):
+        tracemalloc.start()
+        start_time = time.perf_counter()
+        count = loader()
+        elapsed = time.perf_counter() - start_time
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        results[label] = {'seconds': elapsed, 'peak_bytes': peak_memory}
+        print(f"{label}: {count} records in {elapsed:.2f}s "
+              f"({count / elapsed:.0f} records/sec), peak memory {peak_memory / 1024 / 1024:.1f} MiB")
+
+    os.remove(file_path)
+    return results
 
 
 def preprocess_text(text):
@@ -95,6 +311,7 @@ def calculate_word_count(file_path):
 def calculate_letter_statistics(file_path):
     """Calculate letter statistics for the file."""
     letter_stats = {}
+    uppercase_stats = {}
     total_letters = 0
     total_uppercase_letters = 0
 
@@ -103,24 +320,109 @@ def calculate_letter_statistics(file_path):
             for char in line:
                 if char.isalpha():  # Check if the character is alphabetic
                     total_letters += 1
-                    if char.isupper():
-                        total_uppercase_letters += 1
-
                     char_lower = char.lower()
                     letter_stats[char_lower] = letter_stats.get(char_lower, 0) + 1
 
+                    if char.isupper():
+                        total_uppercase_letters += 1
+                        uppercase_stats[char_lower] = uppercase_stats.get(char_lower, 0) + 1
+
     # Calculate the percentage of uppercase letters
     return {
         'letter_stats': letter_stats,
+        'uppercase_stats': uppercase_stats,
         'total_letters': total_letters,
         'total_uppercase_letters': total_uppercase_letters,
         'uppercase_percentage': (total_uppercase_letters / total_letters * 100) if total_letters else 0
     }
 
 
+def build_letter_statistics(char_counts):
+    """
+    Fold a character histogram into the letter statistics structure.
+    :param char_counts: Mapping of character -> number of occurrences.
+    """
+    letter_stats = {}
+    uppercase_stats = {}
+    total_letters = 0
+    total_uppercase_letters = 0
+
+    # Only the distinct characters are inspected, not every occurrence
+    for char, count in char_counts.items():
+        if char.isalpha():
+            total_letters += count
+            char_lower = char.lower()
+            letter_stats[char_lower] = letter_stats.get(char_lower, 0) + count
+
+            if char.isupper():
+                total_uppercase_letters += count
+                uppercase_stats[char_lower] = uppercase_stats.get(char_lower, 0) + count
+
+    return {
+        'letter_stats': letter_stats,
+        'uppercase_stats': uppercase_stats,
+        'total_letters': total_letters,
+        'total_uppercase_letters': total_uppercase_letters,
+        'uppercase_percentage': (total_uppercase_letters / total_letters * 100) if total_letters else 0
+    }
+
+
+def analyze_file(file_path, chunk_size=CHUNK_SIZE):
+    """
+    Calculate word count and letter statistics in a single pass over the file.
+    :param file_path: Path to the text file.
+    :param chunk_size: Approximate number of characters read per chunk.
+    :return: Tuple of (word_count, letter_statistics) in the same format as
+             calculate_word_count and calculate_letter_statistics.
+    """
+    word_count = Counter()
+    char_counts = Counter()
+    punctuation_table = str.maketrans("", "", string.punctuation)
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            # Extend the chunk to the end of the line so no word is split in two
+            if not chunk.endswith('\n'):
+                chunk += f.readline()
+
+            char_counts.update(chunk)
+            word_count.update(chunk.lower().translate(punctuation_table).split())
+
+    return dict(word_count), build_letter_statistics(char_counts)
+
+
+# One lock per output file, so manifests processed at the same time (SpoolFolder) never interleave writes
+output_locks = {}
+output_locks_guard = threading.Lock()
+
+
+@contextmanager
+def open_output(csv_path):
+    """
+    Open an output CSV file for writing, one writer at a time per path.
+    The data is written to a temporary file that replaces the output when complete, so readers
+    (and writers from other modules without this lock) never see a half-written file.
+    """
+    key = os.path.normcase(os.path.abspath(csv_path))
+    with output_locks_guard:
+        lock = output_locks.setdefault(key, threading.Lock())
+    with lock:
+        temp_path = f"{csv_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8', newline='') as csvfile:
+                yield csvfile
+            os.replace(temp_path, csv_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
 def write_word_count_to_csv(word_count, csv_path):
     """Write word count to a CSV file."""
-    with open(csv_path, 'w', encoding='utf-8', newline='') as csvfile:
+    with open_output(csv_path) as csvfile:
         writer = csv.writer(csvfile)
         writer.writerow(['Word', 'Count'])
         for word, count in sorted(word_count.items()):
@@ -129,17 +431,20 @@ def write_word_count_to_csv(word_count, csv_path):
 
 def write_letter_statistics_to_csv(stats, csv_path):
     """Write letter statistics to a CSV file."""
-    with open(csv_path, 'w', encoding='utf-8', newline='') as csvfile:
+    with open_output(csv_path) as csvfile:
         writer = csv.writer(csvfile)
         writer.writerow(['Letter', 'Count_All', 'Count_Uppercase', 'Percentage_Uppercase'])
         for letter, count in sorted(stats['letter_stats'].items()):
-            count_uppercase = stats['letter_stats'].get(letter.upper(), 0)
+            count_uppercase = stats.get('uppercase_stats', {}).get(letter, 0)
             percentage_uppercase = (count_uppercase / count * 100) if count else 0
             writer.writerow([letter, count, count_uppercase, percentage_uppercase])
 
 
-def recreate_csv_files(input_file, word_count_csv, letter_count_csv):
-    """Main function to process the input file and write results to CSV files."""
+def recreate_csv_files(input_file, word_count_csv, letter_count_csv, cache=None):
+    """
+    Main function to process the input file and write results to CSV files.
+    :param cache: Optional StatsCache; on a hit the analysis is skipped and only the CSV files are written.
+    """
     if not os.path.exists(input_file):
         print(f"Error: The input file '{input_file}' does not exist. Please check the file path.")
         return
@@ -149,23 +454,79 @@ def recreate_csv_files(input_file, word_count_csv, letter_count_csv):
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
-    print(f"Processing file: {input_file}")
+    cached = cache.get(input_file) if cache else None
+    if cached:
+        print(f"Using cached statistics for file: {input_file}")
+        word_count, letter_statistics = cached
+    else:
+        print(f"Processing file: {input_file}")
+        word_count, letter_statistics = analyze_file(input_file)
+        if cache:
+            cache.put(input_file, word_count, letter_statistics)
 
-    word_count = calculate_word_count(input_file)
     write_word_count_to_csv(word_count, word_count_csv)
-
-    letter_statistics = calculate_letter_statistics(input_file)
     write_letter_statistics_to_csv(letter_statistics, letter_count_csv)
 
     print(f"Files created:\n - {word_count_csv}\n - {letter_count_csv}")
 
 
+def recreate_csv_files_parallel(jobs, workers, cache=None):
+    """
+    Process a batch of manifest records with a pool of worker processes.
+    Every input file is analyzed once, however many records point at it, and its results are
+    written to every output requested for it. When several records write to the same output path,
+    only the last one in manifest order is written, which is the same result as processing the
+    records one after another, without two workers racing for the file.
+    :param jobs: List of (input_file, word_count_csv, letter_count_csv) tuples in manifest order.
+    :param workers: Number of worker processes.
+    :param cache: Optional StatsCache; only input files without cached results are analyzed.
+    """
+    word_outputs = {}
+    letter_outputs = {}
+    for input_file, word_count_csv, letter_count_csv in jobs:
+        if not os.path.exists(input_file):
+            print(f"Error: The input file '{input_file}' does not exist. Please check the file path.")
+            continue
+        word_outputs[word_count_csv] = input_file
+        letter_outputs[letter_count_csv] = input_file
+
+    input_files = list(dict.fromkeys(list(word_outputs.values()) + list(letter_outputs.values())))
+    results = {}
+    if cache:
+        for input_file in input_files:
+            cached = cache.get(input_file)
+            if cached:
+                results[input_file] = cached
+        input_files = [input_file for input_file in input_files if input_file not in results]
+
+    print(f"Processing {len(input_files)} input file(s) for {len(jobs)} record(s) with {workers} worker(s)")
+    if input_files:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for input_file, result in zip(input_files, executor.map(analyze_file, input_files)):
+                results[input_file] = result
+                if cache:
+                    cache.put(input_file, *result)
+
+    for csv_path, input_file in word_outputs.items():
+        if os.path.dirname(csv_path):
+            os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+        write_word_count_to_csv(results[input_file][0], csv_path)
+    for csv_path, input_file in letter_outputs.items():
+        if os.path.dirname(csv_path):
+            os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+        write_letter_statistics_to_csv(results[input_file][1], csv_path)
+
+    print("Files created:\n" + "\n".join(f" - {path}" for path in list(word_outputs) + list(letter_outputs)))
+
+
 if __name__ == "__main__":
-    # Processing XML input file for records
-    xml_processor = XMLFileProcessor()
+    # Processing XML input file for records, reusing cached statistics
+    cache = StatsCache()
+    xml_processor = XMLFileProcessor(cache=cache)
     xml_processor.process_file()
 
     # Processing default text file and generating CSVs
-    recreate_csv_files(input_file_path, word_count_csv_path, letter_count_csv_path)
+    recreate_csv_files(input_file_path, word_count_csv_path, letter_count_csv_path, cache=cache)
+    cache.close()
 
     print(f"Execution completed. Check the folder: '{DEFAULT_FOLDER}'.")
\ No newline at end of file
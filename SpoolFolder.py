@@ -0,0 +1,214 @@
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import Homework_8
+import Homework_9
+from Homework_6 import FileProcessor, NewsFeed
+from Homework_8 import JSONFileProcessor
+from Homework_9 import XMLFileProcessor
+
+# JSON and XML manifests write the same default CSV files; share one set of per-path output locks
+# between both modules, so their writes are serialized and not only atomic
+Homework_9.output_locks = Homework_8.output_locks
+Homework_9.output_locks_guard = Homework_8.output_locks_guard
+
+
+class SpoolNewsFeed(NewsFeed):
+    # NewsFeed that serializes saves, so several workers can append to the same feed file
+    lock = threading.Lock()
+
+    def save_to_file(self):
+        with self.lock:
+            super().save_to_file()
+
+
+def process_is_running(pid):
+    """Return True if a process with the given id is running."""
+    if os.name == 'nt':
+        import ctypes
+        # PROCESS_QUERY_LIMITED_INFORMATION; os.kill would terminate the process on Windows
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SpoolFolder:
+    """
+    Drain a drop folder: every file is claimed, dispatched to the processor for its extension
+    and handled in a worker pool.
+    """
+    PROCESSING_FOLDER = 'processing'
+    FAILED_FOLDER = 'failed'
+    # Claimed files are named "<pid>-<worker>-<original name>"
+    CLAIM_PATTERN = re.compile(r'^(\d+)-([0-9a-f]+)-(.+)$')
+
+    def __init__(self, folder=None, workers=4, poll_interval=1.0, settle_seconds=0.5):
+        """
+        Initialize the spool folder.
+        :param folder: The drop folder to scan (defaults to FileProcessor.DEFAULT_FOLDER).
+        :param workers: Number of files processed at the same time.
+        :param poll_interval: Seconds between checks of the folder when it is idle.
+        :param settle_seconds: Files modified more recently than this are left alone, since they may still be written.
+        """
+        self.folder = folder or FileProcessor.DEFAULT_FOLDER
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.processing_folder = os.path.join(self.folder, self.PROCESSING_FOLDER)
+        self.failed_folder = os.path.join(self.folder, self.FAILED_FOLDER)
+        self.worker_id = f"{os.getpid()}-{id(self):x}"
+        self.processors = {
+            '.txt': lambda path: FileProcessor(path).process_file(SpoolNewsFeed()),
+            '.json': lambda path: JSONFileProcessor(path).process_file(),
+            '.xml': lambda path: XMLFileProcessor(path).process_file(),
+        }
+
+    def claim(self, path):
+        """
+        Claim a file by renaming it into the processing folder.
+        The rename is atomic, so when two workers race for a file only one of them gets it.
+        :return: The new path of the claimed file, or None if another worker claimed it first.
+        """
+        claimed_path = os.path.join(self.processing_folder, f"{self.worker_id}-{os.path.basename(path)}")
+        try:
+            os.rename(path, claimed_path)
+        except FileNotFoundError:
+            return None
+        return claimed_path
+
+    def recover_claims(self):
+        """
+        Take over files left in the processing folder by workers that are no longer running (after a crash
+        or restart). They are renamed to this worker together with their progress and quarantine files,
+        so the processors resume them from their last commit.
+        :return: The new paths of the recovered files.
+        """
+        recovered = []
+        for name in sorted(os.listdir(self.processing_folder)):
+            match = self.CLAIM_PATTERN.match(name)
+            if (not match or os.path.splitext(name)[1].lower() not in self.processors
+                    or f"{match.group(1)}-{match.group(2)}" == self.worker_id
+                    or process_is_running(int(match.group(1)))):
+                continue
+
+            old_path = os.path.join(self.processing_folder, name)
+            new_path = os.path.join(self.processing_folder, f"{self.worker_id}-{match.group(3)}")
+            try:
+                os.rename(old_path, new_path)
+            except FileNotFoundError:
+                # Another worker recovered it first
+                continue
+            self.move_state_files(old_path, new_path)
+            print(f"Recovered '{old_path}' from a stopped worker.")
+            recovered.append(new_path)
+        return recovered
+
+    @staticmethod
+    def move_state_files(old_path, new_path):
+        """Move the progress and quarantine files of a processor along with its input file."""
+        for suffix in ('.progress', '.quarantine'):
+            if os.path.exists(old_path + suffix):
+                os.replace(old_path + suffix, new_path + suffix)
+
+    def process(self, claimed_path):
+        """Dispatch a claimed file to its processor and move it to the failed folder if it was not consumed."""
+        extension = os.path.splitext(claimed_path)[1].lower()
+        try:
+            self.processors[extension](claimed_path)
+        except Exception as e:
+            print(f"An error occurred while processing '{claimed_path}': {e}")
+
+        # Processors remove the file only after successful processing
+        if os.path.exists(claimed_path):
+            failed_path = os.path.join(self.failed_folder, os.path.basename(claimed_path))
+            os.replace(claimed_path, failed_path)
+            self.move_state_files(claimed_path, failed_path)
+            print(f"File '{claimed_path}' moved to '{self.failed_folder}'.")
+
+    def scan(self):
+        """
+        List the drop folder.
+        :return: The files with a known extension that are no longer being written, and the number of seconds
+                 until the next of the other files settles (None if there are none).
+        """
+        now = time.time()
+        ready, settle_in = [], None
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if not entry.is_file() or os.path.splitext(entry.name)[1].lower() not in self.processors:
+                    continue
+                age = now - entry.stat().st_mtime
+                if age >= self.settle_seconds:
+                    ready.append(entry.path)
+                else:
+                    remaining = self.settle_seconds - age
+                    settle_in = remaining if settle_in is None else min(settle_in, remaining)
+        return ready, settle_in
+
+    def ready_files(self):
+        """Return the files in the drop folder that have a known extension and are no longer being written."""
+        return self.scan()[0]
+
+    def run(self, once=False):
+        """
+        Process the drop folder until interrupted.
+        Files are claimed only while a worker is free, so a slow file never holds back the others.
+        The folder is listed again when its modification time changes (a file was added, renamed or removed),
+        when a worker becomes free while files were left waiting, or when a waiting file has settled.
+        Files left in the processing folder by stopped workers are picked up first.
+        :param once: Drain the files that are there now and return instead of waiting for new ones.
+        """
+        os.makedirs(self.processing_folder, exist_ok=True)
+        os.makedirs(self.failed_folder, exist_ok=True)
+
+        last_mtime = None
+        waiting = False
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            running = {executor.submit(self.process, claimed_path) for claimed_path in self.recover_claims()}
+            while True:
+                timeout = self.poll_interval
+                mtime = os.stat(self.folder).st_mtime_ns
+                if mtime != last_mtime or (waiting and len(running) < self.workers):
+                    last_mtime = mtime
+                    files, settle_in = self.scan()
+                    free_workers = max(self.workers - len(running), 0)
+                    for path in files[:free_workers]:
+                        claimed_path = self.claim(path)
+                        if claimed_path:
+                            running.add(executor.submit(self.process, claimed_path))
+                    # Files that are not settled or did not fit into the pool need another scan
+                    waiting = settle_in is not None or len(files) > free_workers
+                    if settle_in is not None:
+                        timeout = min(timeout, settle_in)
+
+                if once and not running and not waiting and self.pending_count() == 0:
+                    break
+                if running:
+                    done, running = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                else:
+                    time.sleep(timeout)
+
+    def pending_count(self):
+        """Return the number of files with a known extension still waiting in the drop folder."""
+        with os.scandir(self.folder) as entries:
+            return sum(1 for entry in entries
+                       if entry.is_file() and os.path.splitext(entry.name)[1].lower() in self.processors)
+
+
+if __name__ == '__main__':
+    # Drain the default input folder until interrupted
+    SpoolFolder().run()